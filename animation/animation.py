@@ -24,7 +24,11 @@ class Animation(object):
         "lag_factor" : 2,
         # Used by EmptyAnimation to announce itself ignorable
         # in Successions and AnimationGroups
-        "empty" : False
+        "empty" : False,
+        # Animations whose state after update(alpha) depends only
+        # on alpha (and not on earlier calls to update) can have
+        # their frames rendered out of order, e.g. across processes
+        "is_pure_function_of_alpha" : False,
     }
     def __init__(self, mobject, **kwargs):
         mobject = instantiate(mobject)
@@ -56,8 +60,8 @@ class Animation(object):
 
     def update_mobject(self, alpha):
         families = self.all_families_zipped
-        for i, mobs in enumerate(families):
-            sub_alpha = self.get_sub_alpha(alpha, i, len(families))
+        sub_alphas = self.get_sub_alphas(alpha, len(families))
+        for mobs, sub_alpha in zip(families, sub_alphas):
             self.update_submobject(*list(mobs) + [sub_alpha])
         return self
 
@@ -92,6 +96,31 @@ class Animation(object):
             return alpha
         raise Exception("Invalid submobject mode")
 
+    def get_sub_alphas(self, alpha, num_submobjects):
+        """
+        Array of get_sub_alpha(alpha, index, num_submobjects) for
+        every index, computed all at once
+        """
+        if self.__class__.get_sub_alpha.__func__ is not Animation.get_sub_alpha.__func__:
+            return np.array([
+                self.get_sub_alpha(alpha, index, num_submobjects)
+                for index in range(num_submobjects)
+            ])
+        indices = np.arange(num_submobjects, dtype = 'float')
+        if self.submobject_mode in ["lagged_start", "smoothed_lagged_start"]:
+            props = indices/num_submobjects
+            if self.submobject_mode == "smoothed_lagged_start":
+                props = smooth(props)
+            lf = self.lag_factor
+            return np.clip(lf*alpha - (lf-1)*props, 0, 1)
+        elif self.submobject_mode == "one_at_a_time":
+            lowers = indices/num_submobjects
+            uppers = (indices+1)/num_submobjects
+            return np.clip((alpha-lowers)/(uppers-lowers), 0, 1)
+        elif self.submobject_mode == "all_at_once":
+            return alpha*np.ones(num_submobjects)
+        raise Exception("Invalid submobject mode")
+
     def filter_out(self, *filter_functions):
         self.filter_functions += filter_functions
         return self
@@ -119,6 +148,9 @@ class Animation(object):
     def is_remover(self):
         return self.remover
 
+    def is_pure(self):
+        return self.is_pure_function_of_alpha
+
     def clean_up(self, surrounding_scene = None):
         self.update(1)
         if surrounding_scene is not None:
@@ -38,6 +38,9 @@ class Rotating(Animation):
         )
 
 class ShowPartial(Animation):
+    CONFIG = {
+        "is_pure_function_of_alpha" : True,
+    }
     def update_submobject(self, submobject, starting_submobject, alpha):
         submobject.pointwise_become_partial(
             starting_submobject, *self.get_bounds(alpha)
@@ -154,12 +157,20 @@ class Homotopy(Animation):
     CONFIG = {
         "run_time" : 3,
         "apply_function_kwargs" : {},
+        "is_pure_function_of_alpha" : True,
     }
     def __init__(self, homotopy, mobject, **kwargs):
         """
         Homotopy a function from (x, y, z, t) to (x', y', z')
+
+        If homotopy is declared with vectorized_function, it's passed
+        arrays for x, y and z, and should return an (N, 3) array
         """
         def function_at_time_t(t):
+            if is_vectorized_function(homotopy):
+                return vectorized_function(
+                    lambda points : homotopy(points[:,0], points[:,1], points[:,2], t)
+                )
             return lambda p : homotopy(p[0], p[1], p[2], t)
         self.function_at_time_t = function_at_time_t
         digest_config(self, kwargs)
@@ -278,7 +289,7 @@ class WiggleOutThenIn(Animation):
         Animation.__init__(self, mobject, **kwargs)
 
     def update_submobject(self, submobject, starting_sumobject, alpha):
-        submobject.points[:,:] = starting_sumobject.points
+        submobject.points = np.array(starting_sumobject.points)
         submobject.scale(
             interpolate(1, self.scale_value, there_and_back(alpha)),
             about_point = self.scale_about_point
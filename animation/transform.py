@@ -17,6 +17,7 @@ class Transform(Animation):
         "path_func" : None,
         "submobject_mode" : "all_at_once",
         "replace_mobject_with_target_in_scene" : False,
+        "is_pure_function_of_alpha" : True,
     }
     def __init__(self, mobject, target_mobject, **kwargs):
         #Copy target_mobject so as to not mess with caller
@@ -32,6 +33,9 @@ class Transform(Animation):
 
     def update_config(self, **kwargs):
         Animation.update_config(self, **kwargs)
+        #Called as the animation gets played, so
+        #check the batch's inputs afresh
+        self.__dict__.pop("_batch_is_checked", None)
         if "path_arc" in kwargs:
             self.path_func = path_along_arc(
                 kwargs["path_arc"],
@@ -56,6 +60,45 @@ class Transform(Animation):
         submob.interpolate(start, end, alpha, self.path_func)
         return self
 
+    def update_mobject(self, alpha):
+        families = self.all_families_zipped
+        sub_alphas = self.get_sub_alphas(alpha, len(families))
+        batch = self.get_batched_interpolation(alpha)
+        if batch is None or not batch.interpolate(self.path_func, sub_alphas):
+            for mobs, sub_alpha in zip(families, sub_alphas):
+                self.update_submobject(*list(mobs) + [sub_alpha])
+        return self
+
+    def get_batched_interpolation(self, alpha):
+        """
+        Returns a BatchedInterpolation for all_families_zipped when
+        that's equivalent to calling update_submobject on each, else None.
+        It's rebuilt whenever the starting or target mobjects have
+        changed, which is only checked at the start of a play (when
+        update_config is called, or alpha is 0) since the starting and
+        target mobjects of pure animations don't change mid-play.
+        """
+        uses_default_updates = all([
+            #Otherwise the starting and target mobjects are likely to
+            #change every frame (e.g. TransformAnimations)
+            self.is_pure(),
+            self.__class__.update_submobject.__func__ is Transform.update_submobject.__func__,
+            self.__class__.get_all_mobjects.__func__ is Transform.get_all_mobjects.__func__,
+        ])
+        if not uses_default_updates:
+            return None
+        batch = self.__dict__.get("_batched_interpolation")
+        is_checked = self.__dict__.get("_batch_is_checked", False)
+        if batch is not None and is_checked and alpha != 0:
+            return batch
+        if batch is None or not batch.is_up_to_date():
+            batch = None
+            if BatchedInterpolation.can_interpolate(self.all_families_zipped):
+                batch = BatchedInterpolation(self.all_families_zipped, self.mobject)
+            self._batched_interpolation = batch
+        self._batch_is_checked = True
+        return batch
+
     def clean_up(self, surrounding_scene = None):
         Animation.clean_up(self, surrounding_scene)
         if self.replace_mobject_with_target_in_scene and surrounding_scene is not None:
@@ -63,6 +106,138 @@ class Transform(Animation):
             if not self.remover:
                 surrounding_scene.add(self.original_target_mobject)
 
+class BatchedInterpolation(object):
+    """
+    Concatenated starting and target points and styles for the zipped
+    families of a Transform between plain VMobjects, so that each frame
+    takes one vectorized interpolation, rather than a call to interpolate
+    on each submobject.  The mobject being transformed gets its family's
+    points packed, so that results go into its buffer in one go, with
+    only styles scattered back to the submobjects.
+    """
+    STYLE_ATTRS = ["stroke_rgb", "stroke_width", "fill_rgb", "fill_opacity"]
+    STYLE_SIZES = [3, 1, 3, 1]
+
+    @staticmethod
+    def can_interpolate(families):
+        for submob, start, end in families:
+            if not all([isinstance(mob, VMobject) for mob in submob, start, end]):
+                return False
+            has_default_interpolation = all([
+                submob.__class__.interpolate.__func__ is Mobject.interpolate.__func__,
+                submob.__class__.interpolate_color.__func__ is VMobject.interpolate_color.__func__,
+            ])
+            if not has_default_interpolation:
+                return False
+            if start.points.shape != end.points.shape:
+                return False
+            for attr, size in zip(BatchedInterpolation.STYLE_ATTRS, BatchedInterpolation.STYLE_SIZES):
+                if np.size(getattr(start, attr)) != size or np.size(getattr(end, attr)) != size:
+                    return False
+        return True
+
+    def __init__(self, families, mobject):
+        if mobject.get_packed_points() is None:
+            mobject.pack_family_points()
+        self.mobject = mobject
+        self.submobjects = [family[0] for family in families]
+        self.inputs = [mob for family in families for mob in family[1:]]
+        self.input_state = self.get_input_state()
+        starts = [family[1] for family in families]
+        ends = [family[2] for family in families]
+        lengths = [len(start.points) for start in starts]
+        self.offsets = np.cumsum([0] + lengths)
+        self.point_slices = [
+            slice(start, end)
+            for start, end in zip(self.offsets, self.offsets[1:])
+        ]
+        self.point_owners = np.repeat(np.arange(len(families)), lengths)
+        self.start_points = np.concatenate([start.points for start in starts]).astype('float')
+        self.end_points = np.concatenate([end.points for end in ends]).astype('float')
+        self.start_styles = self.get_styles(starts)
+        self.end_styles = self.get_styles(ends)
+        #Whether mobject's buffer lines up with the concatenated points
+        packed_mobs = mobject.family_members_with_points()
+        self.uses_packed_points = all([
+            len(packed_mobs) == len(self.submobjects),
+            all([
+                mob1 is mob2 and len(mob1.points) == length
+                for mob1, mob2, length in zip(packed_mobs, self.submobjects, lengths)
+            ]),
+        ])
+
+    def get_styles(self, mobjects):
+        return np.array([
+            np.hstack([
+                np.ravel(getattr(mob, attr))
+                for attr in self.STYLE_ATTRS
+            ])
+            for mob in mobjects
+        ], dtype = 'float')
+
+    def get_input_state(self):
+        #Points, being read only, only change in ways which change their
+        #version, while styles are always reassigned
+        return [
+            [mob.get_points_version()] + [
+                getattr(mob, attr) for attr in self.STYLE_ATTRS
+            ]
+            for mob in self.inputs
+        ]
+
+    def is_up_to_date(self):
+        for mob, state in zip(self.inputs, self.input_state):
+            if mob.get_points_version() != state[0]:
+                return False
+            for attr, value in zip(self.STYLE_ATTRS, state[1:]):
+                if getattr(mob, attr) is not value:
+                    return False
+        return True
+
+    def interpolate(self, path_func, sub_alphas):
+        """
+        Returns False, having done nothing, if path_func can't be
+        applied to the concatenated points with these sub_alphas
+        """
+        if len(sub_alphas) == 0:
+            return True
+        if np.all(sub_alphas == sub_alphas[0]):
+            if not getattr(path_func, "is_pointwise", False):
+                return False
+            points = path_func(self.start_points, self.end_points, sub_alphas[0])
+        elif path_func is straight_path:
+            point_alphas = sub_alphas[self.point_owners].reshape((-1, 1))
+            points = interpolate(self.start_points, self.end_points, point_alphas)
+        else:
+            return False
+        styles = interpolate(
+            self.start_styles, self.end_styles,
+            sub_alphas.reshape((-1, 1))
+        )
+        finished = (sub_alphas == 1.0)
+        styles[finished] = self.end_styles[finished]
+        packed_points = None
+        if self.uses_packed_points:
+            packed_points = self.mobject.get_packed_points()
+        if packed_points is not None:
+            packed_points[:] = points
+            self.mobject.handle_packed_points_change()
+        else:
+            for submob, point_slice in zip(self.submobjects, self.point_slices):
+                submob.points = points[point_slice]
+        #Each submobject owns its style arrays, so this part can't be
+        #vectorized, but it's kept to one assignment per attribute
+        stroke_rgbs = styles[:,0:3]
+        stroke_widths = styles[:,3]
+        fill_rgbs = styles[:,4:7]
+        fill_opacities = styles[:,7]
+        for index, submob in enumerate(self.submobjects):
+            submob.stroke_rgb = stroke_rgbs[index]
+            submob.stroke_width = stroke_widths[index]
+            submob.fill_rgb = fill_rgbs[index]
+            submob.fill_opacity = fill_opacities[index]
+        return True
+
 class ReplacementTransform(Transform):
     CONFIG = {
         "replace_mobject_with_target_in_scene" : True,
@@ -294,7 +469,9 @@ class ApplyMatrix(ApplyPointwiseFunction):
 
 class TransformAnimations(Transform):
     CONFIG = {
-        "rate_func" : squish_rate_func(smooth)
+        "rate_func" : squish_rate_func(smooth),
+        #Depends on whatever start_anim and end_anim do
+        "is_pure_function_of_alpha" : False,
     }
     def __init__(self, start_anim, end_anim, **kwargs):
         digest_config(self, kwargs, locals())
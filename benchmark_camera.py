@@ -0,0 +1,107 @@
+#!/usr/bin/env python2
+"""
+Times how long the camera takes to rasterize frames full of small
+vectorized mobjects with each of its rasterizer backends, along with
+the old approach of building every path string with astype(str) and
+map before handing it to aggdraw.
+
+   python benchmark_camera.py [--num_mobjects N] [--num_frames N] [-l]
+       [--rasterizers aggdraw numpy]
+"""
+import argparse
+import time
+import aggdraw
+
+from helpers import *
+from camera import Camera, RASTERIZER_CLASSES
+from mobject import VGroup
+from topics.geometry import Circle, RegularPolygon
+
+def legacy_get_pathstring(camera, vmobject):
+    result = ""
+    for mob in [vmobject]+vmobject.get_subpath_mobjects():
+        points = mob.points
+        if len(points) == 0:
+            continue
+        aligned_points = camera.align_points_to_camera(points)
+        coords = camera.points_to_pixel_coords(aligned_points)
+        coord_strings = coords.flatten().astype(str)
+        coord_strings[0] = "M" + coord_strings[0]
+        coord_strings[2::6] = map(lambda s : "C" + str(s), coord_strings[2::6])
+        if vmobject.mark_paths_closed:
+            coord_strings[-1] = coord_strings[-1] + " Z"
+        result += " ".join(coord_strings)
+    return result
+
+class LegacyCamera(Camera):
+    def display_vectorized(self, vmobject, rasterizer = None):
+        if vmobject.is_subpath:
+            return
+        rasterizer = rasterizer or self.get_rasterizer()
+        stroke_width = max(vmobject.get_stroke_width(), 0)
+        pen = None
+        if stroke_width > 0:
+            pen = aggdraw.Pen(rgb_to_hex(self.get_stroke_rgb(vmobject)), stroke_width)
+        fill_opacity = int(self.rgb_max_val*vmobject.get_fill_opacity())
+        fill = None
+        if fill_opacity > 0:
+            fill = aggdraw.Brush(rgb_to_hex(self.get_fill_rgb(vmobject)), fill_opacity)
+        symbol = aggdraw.Symbol(legacy_get_pathstring(self, vmobject))
+        rasterizer.get_canvas().symbol((0, 0), symbol, pen, fill)
+
+def get_test_mobjects(num_mobjects):
+    n_cols = int(np.ceil(np.sqrt(num_mobjects)))
+    mobjects = VGroup(*[
+        (Circle if count%2 == 0 else RegularPolygon)().set_fill(
+            BLUE, opacity = 0.5
+        )
+        for count in range(num_mobjects)
+    ])
+    mobjects.arrange_submobjects_in_grid(n_cols = n_cols)
+    mobjects.scale_to_fit_width(2*SPACE_WIDTH - 1)
+    return mobjects
+
+def time_frames(camera, mobjects, num_frames, move_each_frame):
+    start_time = time.time()
+    for frame in range(num_frames):
+        if move_each_frame:
+            mobjects.shift(0.01*RIGHT)
+        camera.reset()
+        camera.capture_mobject(mobjects)
+    return (time.time() - start_time)/num_frames
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_mobjects", type = int, default = 1000)
+    parser.add_argument("--num_frames", type = int, default = 10)
+    parser.add_argument("-l", "--low_quality", action = "store_true")
+    parser.add_argument(
+        "--rasterizers", nargs = "+",
+        choices = RASTERIZER_CLASSES.keys(),
+        default = RASTERIZER_CLASSES.keys(),
+    )
+    args = parser.parse_args()
+    camera_config = LOW_QUALITY_CAMERA_CONFIG if args.low_quality \
+        else PRODUCTION_QUALITY_CAMERA_CONFIG
+
+    mobjects = get_test_mobjects(args.num_mobjects)
+    print("%d mobjects, %d frames"%(args.num_mobjects, args.num_frames))
+    cases = [("legacy strings", LegacyCamera, "aggdraw")]
+    cases += [
+        (rasterizer, Camera, rasterizer)
+        for rasterizer in args.rasterizers
+    ]
+    for name, camera_class, rasterizer in cases:
+        for move_each_frame in False, True:
+            camera = camera_class(rasterizer = rasterizer, **camera_config)
+            frame_time = time_frames(
+                camera, mobjects, args.num_frames, move_each_frame
+            )
+            print("%-16s %-8s %8.1f ms/frame"%(
+                name,
+                "moving" if move_each_frame else "static",
+                1000*frame_time,
+            ))
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,62 @@
 import numpy as np
 import itertools as it
 import os
+from collections import OrderedDict
 
 from PIL import Image
 from colour import Color
-import aggdraw
-import copy
 
 from helpers import *
 from mobject import Mobject, PMobject, VMobject, \
     ImageMobject, Group
+from rasterizers import *
+
+def round_z_coordinate(mobject):
+    return np.round(mobject.get_center()[2], 2)
+
+def boxes_overlap(box, boxes):
+    """
+    Boxes are given as [x_min, y_min, x_max, y_max], and boxes
+    may be a single box or an array of them.
+    """
+    boxes = np.asarray(boxes)
+    return np.all([
+        box[0] <= boxes[...,2], boxes[...,0] <= box[2],
+        box[1] <= boxes[...,3], boxes[...,1] <= box[3],
+    ], axis = 0)
+
+def union_pixel_boxes(*boxes):
+    boxes = [box for box in boxes if box is not None]
+    if len(boxes) == 0:
+        return None
+    boxes = np.array(boxes)
+    return np.append(boxes[:,:2].min(0), boxes[:,2:].max(0))
+
+def get_box_sums(array, width, axis):
+    """
+    Returns the sums of each run of width consecutive entries
+    along the given axis of array, which gets width-1 shorter.
+    """
+    sums = np.cumsum(array, axis = axis)
+    result = np.take(sums, range(width-1, array.shape[axis]), axis = axis)
+    if array.shape[axis] > width:
+        result[tuple(
+            [slice(None)]*axis + [slice(1, None)]
+        )] -= np.take(sums, range(array.shape[axis] - width), axis = axis)
+    return result
+
+def get_state_without_caches(obj):
+    """
+    Attributes starting with an underscore, like rasterizers, are
+    caches which may hold unpicklable backend state (deepcopying
+    aggdraw objects segfaults), so pickles and copies leave them
+    out, to be rebuilt on demand.
+    """
+    return dict([
+        (key, value)
+        for key, value in obj.__dict__.items()
+        if not key.startswith("_")
+    ])
 
 class Camera(object):
     CONFIG = {
@@ -36,7 +83,25 @@ class Camera(object):
         "use_z_coordinate_for_display_order" : False,
         # z_buff_func is only used if the flag above is set to True.
         # round z coordinate to nearest hundredth when comparring
-        "z_buff_func" : lambda m : np.round(m.get_center()[2], 2),
+        "z_buff_func" : round_z_coordinate,
+        #Backend drawing vectorized mobjects, one of the keys
+        #of RASTERIZER_CLASSES, along with its config
+        "rasterizer" : "aggdraw",
+        "rasterizer_config" : {},
+        #Draw runs of non-overlapping vmobjects with the
+        #same style as a single path
+        "batch_paths_by_style" : True,
+        #Skip mobjects lying entirely outside the frame
+        "cull_off_screen_mobjects" : True,
+        #How images get resampled, "nearest" or "bilinear"
+        "image_filtering" : "nearest",
+        #Draw images which are shown much smaller than their
+        #resolution from downsampled copies
+        "use_image_mipmaps" : True,
+        #Where backgrounds made by make_background_from_func are kept
+        "use_background_cache" : True,
+        "background_cache_directory" : os.path.join(ANIMATIONS_DIR, "background_cache"),
+        "max_cached_image_samplings" : 10,
     }
 
     def __init__(self, background = None, **kwargs):
@@ -45,13 +110,10 @@ class Camera(object):
         self.init_background()
         self.resize_space_shape()
         self.reset()
+        self.reset_render_stats()
 
-    def __deepcopy__(self, memo):
-        # This is to address a strange bug where deepcopying
-        # will result in a segfault, which is somehow related
-        # to the aggdraw library
-        self.canvas = None 
-        return copy.copy(self)
+    def __getstate__(self):
+        return get_state_without_caches(self)
 
     def resize_space_shape(self, fixed_dimension = 0):
         """
@@ -99,10 +161,7 @@ class Camera(object):
     def convert_pixel_array(self, pixel_array, convert_from_floats = False):
         retval = np.array(pixel_array)
         if convert_from_floats:
-            retval = np.apply_along_axis(
-                lambda f : (f * self.rgb_max_val).astype(self.pixel_array_dtype),
-                2,
-                retval)
+            retval = (retval * self.rgb_max_val).astype(self.pixel_array_dtype)
         return retval
 
     def set_pixel_array(self, pixel_array, convert_from_floats = False):
@@ -121,17 +180,50 @@ class Camera(object):
         Sets background by using coords_to_colors_func to determine each pixel's color. Each input 
         to coords_to_colors_func is an (x, y) pair in space (in ordinary space coordinates; not 
         pixel coordinates), and each output is expected to be an RGBA array of 4 floats.
+
+        If coords_to_colors_func is declared with vectorized_function (or is found to work
+        on arrays, see detect_vectorized_function), it's called just once, on an (N, 2) array
+        of the coordinates of all pixels, and should return an (N, 4) array.  Results are
+        kept on disk, keyed by a hash of the function and the shape of the camera.
         """
+        file_path = None
+        if self.use_background_cache:
+            file_path = self.get_background_cache_file_path(coords_to_colors_func)
+            if os.path.exists(file_path):
+                return np.load(file_path)
 
         print "Starting set_background_from_func"
 
         coords = self.get_coords_of_all_pixels()
-        new_background = np.apply_along_axis(
+        flat_coords = coords.reshape((-1, 2))
+        sample_indices = np.linspace(0, len(flat_coords)-1, 7).astype('int')
+        func = detect_vectorized_function(
+            coords_to_colors_func, flat_coords[sample_indices]
+        )
+        flat_colors = apply_function_to_points(func, flat_coords)
+        new_background = flat_colors.reshape(coords.shape[:2] + (-1,))
+        result = self.convert_pixel_array(new_background, convert_from_floats = True)
+
+        if file_path is not None:
+            #Written under a temporary name, so that no other process
+            #picks up a partially written file
+            temp_file_path = "%s_%dTemp.npy"%(file_path[:-len(".npy")], os.getpid())
+            np.save(temp_file_path, result)
+            os.rename(temp_file_path, file_path)
+        return result
+
+    def get_background_cache_file_path(self, coords_to_colors_func):
+        #Imported here, since render_cache imports this module
+        from scene.render_cache import get_render_hash
+        key = get_render_hash(
             coords_to_colors_func,
-            2,
-            coords
+            self.pixel_shape, self.space_shape,
+            self.pixel_array_dtype, self.rgb_max_val,
         )
-        return self.convert_pixel_array(new_background, convert_from_floats = True)
+        directory = self.background_cache_directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        return os.path.join(directory, key + ".npy")
 
     def set_background_from_func(self, coords_to_colors_func):
         self.set_background(self.make_background_from_func(coords_to_colors_func))
@@ -139,6 +231,15 @@ class Camera(object):
     def reset(self):
         self.set_pixel_array(self.background)
 
+    def reset_render_stats(self):
+        self.render_stats = {
+            "num_mobjects_captured" : 0,
+            "num_mobjects_culled" : 0,
+        }
+
+    def get_render_stats(self):
+        return dict(self.render_stats)
+
     ####
 
     def extract_mobject_family_members(self, mobjects, only_those_with_points = False):
@@ -185,6 +286,11 @@ class Camera(object):
 
     def capture_mobjects(self, mobjects, **kwargs):
         mobjects = self.get_mobjects_to_display(mobjects, **kwargs)
+        num_mobjects = len(mobjects)
+        if self.cull_off_screen_mobjects and self.can_bound_pixel_regions():
+            mobjects = self.cull_mobjects(mobjects)
+        self.render_stats["num_mobjects_captured"] += len(mobjects)
+        self.render_stats["num_mobjects_culled"] += num_mobjects - len(mobjects)
 
         # Organize this list into batches of the same type, and 
         # apply corresponding function to those batches
@@ -210,16 +316,124 @@ class Camera(object):
                 if batch_type == mobject_type:
                     func(batch)
 
+    ## Methods for working with regions of the frame
+
+    def can_bound_pixel_regions(self):
+        """
+        Whether boxes in space can be mapped to boxes of pixels, which
+        requires the usual affine map from space to pixels.
+        """
+        return all([
+            getattr(self.__class__, name).im_func is getattr(Camera, name).im_func
+            for name in [
+                "align_points_to_camera",
+                "points_to_pixel_coords",
+            ]
+        ])
+
+    def get_drawn_points_boxes(self, mobjects):
+        """
+        Returns an array of the [mins, maxes] of all points drawn for
+        each of mobjects (each being assumed to have points), which for
+        a vmobject includes those of its subpaths.
+        """
+        boxes = []
+        for mobject in mobjects:
+            box = mobject.get_own_points_box()
+            if isinstance(mobject, VMobject):
+                subpath_boxes = [
+                    sm.get_own_points_box()
+                    for sm in mobject.get_subpath_mobjects()
+                ]
+                subpath_boxes = [b for b in subpath_boxes if b is not None]
+                if len(subpath_boxes) > 0:
+                    all_boxes = np.array([box] + subpath_boxes)
+                    box = np.array([all_boxes[:,0].min(0), all_boxes[:,1].max(0)])
+            boxes.append(box)
+        return np.array(boxes).reshape((len(mobjects), 2, -1))
+
+    def get_pixel_margins(self, mobjects):
+        #Room for strokes, whose joins may reach well past half their
+        #width from the path (see Rasterizer.get_stroke_extent), the
+        #thickness of points, and antialiasing
+        rasterizer = self.get_rasterizer()
+        extents = np.array([
+            rasterizer.get_stroke_extent(mobject.get_stroke_width())
+            if isinstance(mobject, VMobject) else
+            max(getattr(mobject, "stroke_width", 0), 0)/2.0
+            for mobject in mobjects
+        ])
+        return np.ceil(extents).astype('int') + 2
+
+    def cull_mobjects(self, mobjects):
+        """
+        Filters out mobjects whose pixel bounding boxes, padded for
+        stroke width, lie entirely outside the frame.
+        """
+        if len(mobjects) == 0:
+            return mobjects
+        boxes = self.get_drawn_points_boxes(mobjects)
+        corners = self.points_to_pixel_coords(self.align_points_to_camera(
+            boxes.reshape((2*len(mobjects), boxes.shape[2]))
+        )).reshape((len(mobjects), 2, 2))
+        mins, maxes = corners.min(1), corners.max(1)
+        margins = self.get_pixel_margins(mobjects)
+        height, width = self.pixel_array.shape[:2]
+        on_screen = reduce(op.and_, [
+            maxes[:,0] + margins >= 0,
+            maxes[:,1] + margins >= 0,
+            mins[:,0] - margins < width,
+            mins[:,1] - margins < height,
+        ])
+        return [
+            mobject
+            for mobject, is_on_screen in zip(mobjects, on_screen)
+            if is_on_screen
+        ]
+
+    def get_pixel_bounding_box(self, mobjects):
+        """
+        Returns [x_min, y_min, x_max, y_max] (with the maxes exclusive)
+        for a region of pixels which contains everything capturing the
+        families of mobjects could draw, clipped to the frame, or None
+        when that's nothing.  This covers all points, handles included,
+        plus a margin for stroke width and antialiasing.
+        """
+        members = self.extract_mobject_family_members(
+            mobjects, only_those_with_points = True
+        )
+        if len(members) == 0:
+            return None
+        boxes = self.get_drawn_points_boxes(members)
+        corners = self.points_to_pixel_coords(self.align_points_to_camera(
+            np.array([boxes[:,0].min(0), boxes[:,1].max(0)])
+        ))
+        margin = self.get_pixel_margins(members).max()
+        height, width = self.pixel_array.shape[:2]
+        box = np.array([
+            max(corners[:,0].min() - margin, 0),
+            max(corners[:,1].min() - margin, 0),
+            min(corners[:,0].max() + margin + 1, width),
+            min(corners[:,1].max() + margin + 1, height),
+        ])
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return None
+        return box
+
+    def set_pixel_region(self, pixel_array, box):
+        x0, y0, x1, y1 = box
+        self.pixel_array[y0:y1, x0:x1] = pixel_array[y0:y1, x0:x1]
+
     ## Methods associated with svg rendering
 
-    def get_aggdraw_canvas(self):
-        if not hasattr(self, "canvas") or not self.canvas:
-            self.reset_aggdraw_canvas()
-        return self.canvas
+    def make_rasterizer(self):
+        rasterizer_class = get_rasterizer_class(self.rasterizer)
+        return rasterizer_class(self, **self.rasterizer_config)
 
-    def reset_aggdraw_canvas(self):
-        image = Image.fromarray(self.pixel_array, mode = self.image_mode)
-        self.canvas = aggdraw.Draw(image)
+    def get_rasterizer(self):
+        if getattr(self, "_rasterizer", None) is None:
+            self._rasterizer = self.make_rasterizer()
+        return self._rasterizer
 
     def display_multiple_vectorized_mobjects(self, vmobjects):
         if len(vmobjects) == 0:
@@ -235,41 +449,105 @@ class Camera(object):
                 self.display_multiple_non_background_colored_vmobjects(batch)
 
     def display_multiple_non_background_colored_vmobjects(self, vmobjects):
-        self.reset_aggdraw_canvas()
-        canvas = self.get_aggdraw_canvas()
-        for vmobject in vmobjects:
-            self.display_vectorized(vmobject, canvas)
-        canvas.flush()
+        rasterizer = self.get_rasterizer()
+        rasterizer.begin(self.pixel_array)
+        if self.batch_paths_by_style:
+            for style, coords_list in self.get_style_batched_paths(vmobjects):
+                self.draw_path(coords_list, style, rasterizer)
+        else:
+            for vmobject in vmobjects:
+                self.display_vectorized(vmobject, rasterizer)
+        rasterizer.flush()
 
-    def display_vectorized(self, vmobject, canvas = None):
+    def display_vectorized(self, vmobject, rasterizer = None):
         if vmobject.is_subpath:
             #Subpath vectorized mobjects are taken care
             #of by their parent
             return
-        canvas = canvas or self.get_aggdraw_canvas()
-        pen, fill = self.get_pen_and_fill(vmobject)
-        pathstring = self.get_pathstring(vmobject)
-        symbol = aggdraw.Symbol(pathstring)
-        canvas.symbol((0, 0), symbol, pen, fill)
+        coords_list = self.get_path_pixel_coords(vmobject)
+        if len(coords_list) == 0:
+            return
+        self.draw_path(coords_list, self.get_path_style(vmobject), rasterizer)
 
-    def get_pen_and_fill(self, vmobject):
-        stroke_width = max(vmobject.get_stroke_width(), 0)
-        if stroke_width == 0:
-            pen = None
-        else:
-            stroke_rgb = self.get_stroke_rgb(vmobject)
-            stroke_hex = rgb_to_hex(stroke_rgb)
-            pen = aggdraw.Pen(stroke_hex, stroke_width)
+    def draw_path(self, coords_list, style, rasterizer = None):
+        rasterizer = rasterizer or self.get_rasterizer()
+        closed, stroke_rgb, stroke_width, fill_rgb, fill_opacity = style
+        if fill_rgb is not None:
+            rasterizer.fill_path(coords_list, closed, fill_rgb, fill_opacity)
+        if stroke_rgb is not None:
+            rasterizer.stroke_path(coords_list, closed, stroke_rgb, stroke_width)
 
-        fill_opacity = int(self.rgb_max_val*vmobject.get_fill_opacity())
-        if fill_opacity == 0:
-            fill = None
-        else:
-            fill_rgb = self.get_fill_rgb(vmobject)
-            fill_hex = rgb_to_hex(fill_rgb)
-            fill = aggdraw.Brush(fill_hex, fill_opacity)
+    def get_path_style(self, vmobject):
+        """
+        Returns (closed, stroke_rgb, stroke_width, fill_rgb, fill_opacity),
+        where stroke_rgb or fill_rgb is None when that part of the
+        path isn't drawn.  Two paths with equal styles can be drawn
+        as one.
+        """
+        stroke_width = max(vmobject.get_stroke_width(), 0)
+        stroke_rgb = None
+        if stroke_width > 0:
+            stroke_rgb = tuple(self.get_stroke_rgb(vmobject))
+        fill_opacity = vmobject.get_fill_opacity()
+        fill_rgb = None
+        if int(self.rgb_max_val*fill_opacity) > 0:
+            fill_rgb = tuple(self.get_fill_rgb(vmobject))
+        return (
+            vmobject.mark_paths_closed,
+            stroke_rgb, stroke_width,
+            fill_rgb, fill_opacity,
+        )
 
-        return (pen, fill)
+    def get_style_batched_paths(self, vmobjects):
+        """
+        Merges runs of consecutive vmobjects with the same style into
+        compound paths, returning a list of (style, coords_list) pairs.
+        Drawing such a run as one path only looks the same as drawing
+        its members one by one if none of them overlap, so a new batch
+        is started whenever a path's pixel bounding box (padded for
+        stroke width and antialiasing) meets one from the current run.
+        """
+        rasterizer = self.get_rasterizer()
+        batches = []
+        for vmobject in vmobjects:
+            if vmobject.is_subpath:
+                continue
+            style = self.get_path_style(vmobject)
+            closed, stroke_rgb, stroke_width, fill_rgb, fill_opacity = style
+            if stroke_rgb is None and fill_rgb is None:
+                continue
+            coords_list = self.get_path_pixel_coords(vmobject)
+            if len(coords_list) == 0:
+                continue
+            all_coords = np.concatenate(coords_list)
+            margin = 1
+            if stroke_rgb is not None:
+                margin += int(np.ceil(rasterizer.get_stroke_extent(stroke_width)))
+            box = np.append(
+                all_coords.min(0) - margin, all_coords.max(0) + margin
+            )
+            if batches and batches[-1][0] == style:
+                batch = batches[-1]
+                batch_style, batch_coords_list, boxes, num_boxes, union_box = batch
+                if not boxes_overlap(box, union_box) or \
+                not np.any(boxes_overlap(box, boxes[:num_boxes])):
+                    batch_coords_list.extend(coords_list)
+                    if num_boxes == len(boxes):
+                        #Grown geometrically, so that long runs
+                        #(e.g. NumberPlane lines) don't copy every time
+                        boxes = batch[2] = np.append(boxes, boxes, axis = 0)
+                    boxes[num_boxes] = box
+                    batch[3] = num_boxes + 1
+                    union_box[:2] = np.minimum(union_box[:2], box[:2])
+                    union_box[2:] = np.maximum(union_box[2:], box[2:])
+                    continue
+            boxes = np.zeros((16, 4))
+            boxes[0] = box
+            batches.append([style, list(coords_list), boxes, 1, box.copy()])
+        return [
+            (batch[0], batch[1])
+            for batch in batches
+        ]
 
     def color_to_hex_l(self, color):
         try:
@@ -283,27 +561,26 @@ class Camera(object):
     def get_fill_rgb(self, vmobject):
         return vmobject.get_fill_rgb()
 
-    def get_pathstring(self, vmobject):
-        result = ""
+    def get_path_pixel_coords(self, vmobject):
+        result = []
         for mob in [vmobject]+vmobject.get_subpath_mobjects():
             points = mob.points
             # points = self.adjust_out_of_range_points(points)            
             if len(points) == 0:
                 continue
             aligned_points = self.align_points_to_camera(points)
-            coords = self.points_to_pixel_coords(aligned_points)
-            coord_strings = coords.flatten().astype(str)
-            #Start new path string with M
-            coord_strings[0] = "M" + coord_strings[0]
-            #The C at the start of every 6th number communicates
-            #that the following 6 define a cubic Bezier
-            coord_strings[2::6] = map(lambda s : "C" + str(s), coord_strings[2::6])
-            #Possibly finish with "Z"
-            if vmobject.mark_paths_closed:
-                coord_strings[-1] = coord_strings[-1] + " Z"
-            result += " ".join(coord_strings)
+            result.append(self.points_to_pixel_coords(aligned_points))
         return result
 
+    def get_pathstring(self, vmobject):
+        return self.pixel_coords_to_pathstring(
+            self.get_path_pixel_coords(vmobject),
+            vmobject.mark_paths_closed
+        )
+
+    def pixel_coords_to_pathstring(self, coords_list, closed):
+        return pixel_coords_to_pathstring(coords_list, closed)
+
     def get_background_colored_vmobject_displayer(self):
         #Quite wordy to type out a bunch
         long_name = "background_colored_vmobject_displayer"
@@ -328,34 +605,64 @@ class Camera(object):
             )
 
     def display_point_cloud(self, points, rgbas, thickness):
+        """
+        Each point gets splatted onto the thickness x thickness square
+        of pixels at and around its position.  Rather than drawing every
+        square, colors premultiplied by alpha are summed into an array
+        at the points' pixels, which then gets summed over squares with
+        one (separable) pass.  Where points overlap, the color is their
+        alpha weighted average, and the coverage is as if they'd been
+        layered on top of each other.
+        """
         if len(points) == 0:
             return
         points = self.align_points_to_camera(points)
         pixel_coords = self.points_to_pixel_coords(points)
-        pixel_coords = self.thickened_coordinates(
-            pixel_coords, thickness
-        )
-        rgba_len = self.pixel_array.shape[2]
-
-        rgbas = (self.rgb_max_val*rgbas).astype(self.pixel_array_dtype)
-        target_len = len(pixel_coords)
-        factor = target_len/len(rgbas)
-        rgbas = np.array([rgbas]*factor).reshape((target_len, rgba_len))
-
-        on_screen_indices = self.on_screen_pixels(pixel_coords)        
-        pixel_coords = pixel_coords[on_screen_indices]        
-        rgbas = rgbas[on_screen_indices]
-
-        ph, pw = self.pixel_shape
-
-        flattener = np.array([1, pw], dtype = 'int')
-        flattener = flattener.reshape((2, 1))
-        indices = np.dot(pixel_coords, flattener)[:,0]
-        indices = indices.astype('int')
-        
-        new_pa = self.pixel_array.reshape((ph*pw, rgba_len))
-        new_pa[indices] = rgbas
-        self.pixel_array = new_pa.reshape((ph, pw, rgba_len))
+        thickness = max(int(thickness), 1)
+        #Points cover offsets from low to high (inclusive),
+        #matching get_thickening_nudges
+        low, high = -thickness/2 + 1, thickness/2
+        ph, pw = self.pixel_array.shape[:2]
+        xs, ys = pixel_coords[:,0], pixel_coords[:,1]
+        overlaps_frame = reduce(op.and_, [
+            xs + high >= 0, xs + low < pw,
+            ys + high >= 0, ys + low < ph,
+        ])
+        if not np.any(overlaps_frame):
+            return
+        xs, ys = xs[overlaps_frame], ys[overlaps_frame]
+        rgbas = np.array(rgbas)[overlaps_frame]
+        x0, y0 = max(xs.min() + low, 0), max(ys.min() + low, 0)
+        x1, y1 = min(xs.max() + high + 1, pw), min(ys.max() + high + 1, ph)
+
+        #Sums are accumulated over the points' positions, which reach
+        #thickness-1 pixels further than the box they're drawn in
+        source_shape = (y1 - y0 + thickness - 1, x1 - x0 + thickness - 1)
+        flat_indices = (ys - y0 + high)*source_shape[1] + (xs - x0 + high)
+        alphas = rgbas[:,3]
+        weights = [
+            alphas,
+            rgbas[:,0]*alphas, rgbas[:,1]*alphas, rgbas[:,2]*alphas,
+            #Sums of these give log(prod(1-alpha)), for coverage
+            np.log(np.maximum(1 - alphas, 1e-7)),
+        ]
+        sums = np.array([
+            np.bincount(
+                flat_indices, weights = weight,
+                minlength = source_shape[0]*source_shape[1]
+            )
+            for weight in weights
+        ]).reshape((len(weights),) + source_shape)
+        sums = get_box_sums(get_box_sums(sums, thickness, 1), thickness, 2)
+        alpha_sums, rgb_sums, log_transparency = sums[0], sums[1:4], sums[4]
+
+        image = np.zeros((y1 - y0, x1 - x0, 4))
+        image[...,:3] = np.transpose(fdiv(
+            rgb_sums, alpha_sums, zero_over_zero_value = 0
+        ), (1, 2, 0))
+        image[...,3] = 1 - np.exp(log_transparency)
+        image = np.round(self.rgb_max_val*image).astype(self.pixel_array_dtype)
+        self.overlay_rgba_array(image, np.array([x0, y0, x1, y1]))
 
     def display_multiple_image_mobjects(self, image_mobjects):
         for image_mobject in image_mobjects:
@@ -363,94 +670,72 @@ class Camera(object):
 
     def display_image_mobject(self, image_mobject):
         corner_coords = self.points_to_pixel_coords(image_mobject.points)
-        ul_coords, ur_coords, dl_coords = corner_coords
-        right_vect = ur_coords - ul_coords
-        down_vect = dl_coords - ul_coords
-
         impa = image_mobject.pixel_array
+        if self.use_image_mipmaps:
+            impa = image_mobject.get_mipmap(
+                self.get_mipmap_level(corner_coords, impa.shape[:2])
+            )
+        sampling = self.get_image_sampling(corner_coords, impa.shape[:2])
+        if sampling is None:
+            return
+        image = sampling.sample(impa, self.get_scratch_buffers())
+        self.overlay_rgba_array(image, sampling.box)
 
-        oh, ow = self.pixel_array.shape[:2] #Outer width and height
-        ih, iw = impa.shape[:2] #inner with and height
-        rgb_len = self.pixel_array.shape[2]
-
-        image = np.zeros((oh, ow, rgb_len), dtype = self.pixel_array_dtype)
-
-        if right_vect[1] == 0 and down_vect[0] == 0:
-            rv0 = right_vect[0]
-            dv1 = down_vect[1]
-            x_indices = np.arange(rv0, dtype = 'int')*iw/rv0
-            y_indices = np.arange(dv1, dtype = 'int')*ih/dv1
-            stretched_impa = impa[y_indices][:,x_indices]
-
-            x0, x1 = ul_coords[0], ur_coords[0] 
-            y0, y1 = ul_coords[1], dl_coords[1]
-            if x0 >= ow or x1 < 0 or y0 >= oh or y1 < 0:
-                return
-            siy0 = max(-y0, 0) #stretched_impa y0
-            siy1 = dv1 - max(y1-oh, 0)
-            six0 = max(-x0, 0)
-            six1 = rv0 - max(x1-ow, 0)
-            x0 = max(x0, 0)
-            y0 = max(y0, 0)
-            image[y0:y1, x0:x1] = stretched_impa[siy0:siy1, six0:six1]
-        else:
-            # Alternate (slower) tactic if image is tilted
-            # List of all coordinates of pixels, given as (x, y), 
-            # which matches the return type of points_to_pixel_coords,
-            # even though np.array indexing naturally happens as (y, x)
-            all_pixel_coords = np.zeros((oh*ow, 2), dtype = 'int')
-            a = np.arange(oh*ow, dtype = 'int')
-            all_pixel_coords[:,0] = a%ow
-            all_pixel_coords[:,1] = a/ow
-
-            recentered_coords = all_pixel_coords - ul_coords
-            coord_norms = np.linalg.norm(recentered_coords, axis = 1)
-
-            with np.errstate(divide = 'ignore'):
-                ix_coords, iy_coords = [
-                    np.divide(
-                        dim*np.dot(recentered_coords, vect),
-                        np.dot(vect, vect),
-                    )
-                    for vect, dim in (right_vect, iw), (down_vect, ih)
-                ]
-            to_change = reduce(op.and_, [
-                ix_coords >= 0, ix_coords < iw,
-                iy_coords >= 0, iy_coords < ih,
-            ])
-            n_to_change = np.sum(to_change)
-            inner_flat_coords = iw*iy_coords[to_change] + ix_coords[to_change]
-            flat_impa = impa.reshape((iw*ih, rgb_len))
-            target_rgbas = flat_impa[inner_flat_coords, :]
-
-            image = image.reshape((ow*oh, rgb_len))
-            image[to_change] = target_rgbas
-            image = image.reshape((oh, ow, rgb_len))
-        self.overlay_rgba_array(image)
-
-    def overlay_rgba_array(self, arr):
-        fg = arr
-        bg = self.pixel_array
-        # rgba_max_val = self.rgb_max_val
-        src_rgb, src_a, dst_rgb, dst_a = [
-            a.astype(np.float32)/self.rgb_max_val
-            for a in fg[...,:3], fg[...,3], bg[...,:3], bg[...,3]
-        ]
-
-        out_a = src_a + dst_a*(1.0-src_a)
-
-        # When the output alpha is 0 for full transparency, 
-        # we have a choice over what RGB value to use in our
-        # output representation. We choose 0 here.
-        out_rgb = fdiv(
-            src_rgb*src_a[..., None] + \
-            dst_rgb*dst_a[..., None]*(1.0-src_a[..., None]),
-            out_a[..., None],
-            zero_over_zero_value = 0
+    def get_mipmap_level(self, corner_coords, image_shape):
+        """
+        Picks the smallest mipmap which still has at least
+        one pixel for each pixel the image covers on screen.
+        """
+        ul_coords, ur_coords, dl_coords = corner_coords
+        ih, iw = image_shape
+        on_screen_width = np.linalg.norm(ur_coords - ul_coords)
+        on_screen_height = np.linalg.norm(dl_coords - ul_coords)
+        if on_screen_width == 0 or on_screen_height == 0:
+            return 0
+        shrink_factor = min(iw/on_screen_width, ih/on_screen_height)
+        if shrink_factor < 2:
+            return 0
+        return int(np.log2(shrink_factor))
+
+    def get_image_sampling(self, corner_coords, image_shape):
+        """
+        Samplings are reused for as long as an image's corners
+        land on the same pixels, and its shape stays the same.
+        """
+        key = (
+            corner_coords.tobytes(), tuple(image_shape),
+            tuple(self.pixel_array.shape[:2]), self.image_filtering,
         )
-
-        self.pixel_array[..., :3] = out_rgb*self.rgb_max_val
-        self.pixel_array[..., 3] = out_a*self.rgb_max_val
+        cache = self.get_image_sampling_cache()
+        if key in cache:
+            sampling = cache.pop(key)
+        else:
+            sampling = ImageSampling(
+                corner_coords, image_shape,
+                self.pixel_array.shape[:2], self.image_filtering
+            )
+            if sampling.box is None:
+                sampling = None
+        cache[key] = sampling
+        if len(cache) > self.max_cached_image_samplings:
+            cache.popitem(last = False)
+        return sampling
+
+    def get_image_sampling_cache(self):
+        if getattr(self, "_image_sampling_cache", None) is None:
+            self._image_sampling_cache = OrderedDict()
+        return self._image_sampling_cache
+
+    def overlay_rgba_array(self, arr, box = None):
+        rasterizer = self.get_rasterizer()
+        rasterizer.begin(self.pixel_array)
+        rasterizer.composite_layer(arr, box)
+        rasterizer.flush()
+
+    def get_scratch_buffers(self):
+        if getattr(self, "_scratch_buffers", None) is None:
+            self._scratch_buffers = ScratchBuffers()
+        return self._scratch_buffers
 
     def align_points_to_camera(self, points):
         ## This is where projection should live
@@ -513,6 +798,21 @@ class Camera(object):
         return pixel_coords.reshape((size/2, 2))
 
     def get_coords_of_all_pixels(self):
+        """
+        Returns an array, addressed in (y, x) order like pixel_array, of
+        the (x, y) space coordinates of each pixel.  It's shared between
+        calls for as long as the camera's shape stays the same, so
+        don't modify it.
+        """
+        key = (tuple(self.pixel_shape), tuple(self.space_shape))
+        cached = getattr(self, "_coords_of_all_pixels", None)
+        if cached is None or cached[0] != key:
+            coords = self.compute_coords_of_all_pixels()
+            coords.flags.writeable = False
+            self._coords_of_all_pixels = cached = (key, coords)
+        return cached[1]
+
+    def compute_coords_of_all_pixels(self):
         # These are in x, y order, to help me keep things straight
         full_space_dims = np.array(self.space_shape)[::-1] * 2
         full_pixel_dims = np.array(self.pixel_shape)[::-1]
@@ -536,22 +836,132 @@ class Camera(object):
 
         return centered_space_coords
 
+class ImageSampling(object):
+    """
+    Works out which pixels of an image with shape image_shape land on
+    which pixels of a frame with shape frame_shape, when its upper left,
+    upper right and lower left corners land on corner_coords.  Only the
+    box of the frame covered by the image gets considered.
+    """
+    def __init__(self, corner_coords, image_shape, frame_shape, filtering):
+        self.image_shape = tuple(image_shape)
+        self.filtering = filtering
+        if filtering not in ["nearest", "bilinear"]:
+            raise Exception("Unknown image filtering %s"%filtering)
+        ul_coords, ur_coords, dl_coords = corner_coords
+        right_vect = ur_coords - ul_coords
+        down_vect = dl_coords - ul_coords
+        all_corners = np.array([
+            ul_coords, ur_coords, dl_coords,
+            ul_coords + right_vect + down_vect,
+        ])
+        oh, ow = frame_shape
+        x0, y0 = np.maximum(all_corners.min(0), 0)
+        x1, y1 = np.minimum(all_corners.max(0), [ow, oh])
+        self.box = None
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.box = np.array([x0, y0, x1, y1])
+        self.region_shape = (y1 - y0, x1 - x0)
+        self.is_axis_aligned = all([
+            filtering == "nearest",
+            right_vect[1] == 0, down_vect[0] == 0,
+            right_vect[0] > 0, down_vect[1] > 0,
+        ])
+        if self.is_axis_aligned:
+            self.init_axis_aligned_indices(ul_coords, right_vect, down_vect)
+        else:
+            self.init_affine_indices(ul_coords, right_vect, down_vect)
+
+    def init_axis_aligned_indices(self, ul_coords, right_vect, down_vect):
+        ih, iw = self.image_shape
+        x0, y0, x1, y1 = self.box
+        rv0, dv1 = right_vect[0], down_vect[1]
+        x_indices = (np.arange(x0, x1) - ul_coords[0])*iw/rv0
+        y_indices = (np.arange(y0, y1) - ul_coords[1])*ih/dv1
+        self.grid = np.ix_(y_indices, x_indices)
+
+    def init_affine_indices(self, ul_coords, right_vect, down_vect):
+        ih, iw = self.image_shape
+        x0, y0, x1, y1 = self.box
+        matrix = np.array([right_vect, down_vect]).T.astype('float')
+        if np.linalg.det(matrix) == 0:
+            self.box = None
+            return
+        #Image coordinates (u, v), scaled to pixels of the image,
+        #of every pixel in the box, from inverting
+        #pixel = ul_coords + u*right_vect + v*down_vect
+        pixel_coords = np.indices(self.region_shape)[::-1].reshape((2, -1)).T
+        pixel_coords = pixel_coords + [x0 - ul_coords[0], y0 - ul_coords[1]]
+        uv = np.dot(pixel_coords, np.linalg.inv(matrix).T)
+        ix_coords = uv[:,0]*iw
+        iy_coords = uv[:,1]*ih
+        in_image = reduce(op.and_, [
+            ix_coords >= 0, ix_coords < iw,
+            iy_coords >= 0, iy_coords < ih,
+        ])
+        self.target_indices = np.flatnonzero(in_image)
+        ix_coords = ix_coords[in_image]
+        iy_coords = iy_coords[in_image]
+        if self.filtering == "nearest":
+            self.source_indices = \
+                iw*iy_coords.astype('int') + ix_coords.astype('int')
+            return
+        #Bilinear filtering samples around pixel centers, clamping
+        #neighbors at the edges of the image
+        ix_coords = np.clip(ix_coords - 0.5, 0, iw - 1)
+        iy_coords = np.clip(iy_coords - 0.5, 0, ih - 1)
+        left, top = ix_coords.astype('int'), iy_coords.astype('int')
+        right = np.minimum(left + 1, iw - 1)
+        bottom = np.minimum(top + 1, ih - 1)
+        fx = (ix_coords - left).astype(np.float32)
+        fy = (iy_coords - top).astype(np.float32)
+        self.source_indices = np.array([
+            iw*top + left, iw*top + right,
+            iw*bottom + left, iw*bottom + right,
+        ])
+        self.weights = np.array([
+            (1-fx)*(1-fy), fx*(1-fy),
+            (1-fx)*fy, fx*fy,
+        ])[:,:,None]
+
+    def sample(self, image_array, buffers):
+        """
+        Returns the part of the resampled image within box, which
+        is only good until the next call using the same buffers.
+        """
+        rgba_len = image_array.shape[2]
+        if self.is_axis_aligned:
+            return image_array[self.grid]
+        result = buffers.get(
+            "image_sample", self.region_shape + (rgba_len,), image_array.dtype
+        )
+        result[:] = 0
+        flat_result = result.reshape((-1, rgba_len))
+        flat_image = image_array.reshape((-1, rgba_len))
+        if self.filtering == "nearest":
+            flat_result[self.target_indices] = flat_image[self.source_indices]
+        else:
+            samples = flat_image[self.source_indices]
+            flat_result[self.target_indices] = (samples*self.weights).sum(0)
+        return result
+
 class BackgroundColoredVMobjectDisplayer(object):
     def __init__(self, camera):
         self.camera = camera
         self.file_name_to_pixel_array_map = {}
-        self.init_canvas()
-
-    def init_canvas(self):
         self.pixel_array = np.zeros(
             self.camera.pixel_array.shape,
             dtype = self.camera.pixel_array_dtype,
         )
-        self.reset_canvas()
 
-    def reset_canvas(self):
-        image = Image.fromarray(self.pixel_array, mode = self.camera.image_mode)
-        self.canvas = aggdraw.Draw(image)
+    def __getstate__(self):
+        return get_state_without_caches(self)
+
+    def get_rasterizer(self):
+        if getattr(self, "_rasterizer", None) is None:
+            self._rasterizer = self.camera.make_rasterizer()
+        return self._rasterizer
 
     def resize_background_array(
         self, background_array, 
@@ -586,11 +996,13 @@ class BackgroundColoredVMobjectDisplayer(object):
             cvmobjects, lambda cv : cv.get_background_image_file()
         )
         curr_array = None
+        rasterizer = self.get_rasterizer()
         for batch, image_file in batch_image_file_pairs:
             background_array = self.get_background_array(image_file)
+            rasterizer.begin(self.pixel_array)
             for cvmobject in batch:
-                self.camera.display_vectorized(cvmobject, self.canvas)
-            self.canvas.flush()
+                self.camera.display_vectorized(cvmobject, rasterizer)
+            rasterizer.flush()
             new_array = np.array(
                 (background_array*self.pixel_array.astype('float')/255),
                 dtype = self.camera.pixel_array_dtype
@@ -600,7 +1012,6 @@ class BackgroundColoredVMobjectDisplayer(object):
             else:
                 curr_array = np.maximum(curr_array, new_array)
             self.pixel_array[:,:] = 0
-            self.reset_canvas()
         return curr_array
 
 
@@ -641,7 +1052,9 @@ class MappingCamera(Camera):
     }
 
     def points_to_pixel_coords(self, points):
-        return Camera.points_to_pixel_coords(self, np.apply_along_axis(self.mapping_func, 1, points))
+        return Camera.points_to_pixel_coords(
+            self, apply_function_to_points(self.mapping_func, points)
+        )
     
     def capture_mobjects(self, mobjects, **kwargs):
         mobjects = self.get_mobjects_to_display(mobjects, **kwargs)
@@ -0,0 +1,513 @@
+import numpy as np
+from collections import OrderedDict
+
+from PIL import Image
+import aggdraw
+
+from helpers import *
+
+class Rasterizer(object):
+    """
+    Draws vectorized paths onto an RGBA pixel array for a camera.
+
+    Paths are passed in as lists of pixel coordinate arrays, one per
+    subpath, each holding the 3k+1 control points of k cubic Bezier
+    curves.  Drawing starts with begin, which sets the array to draw
+    onto, and may be deferred until flush is called.  Rasterizers
+    hold onto whatever state their backend needs between frames, so
+    cameras keep them out of their pickled state and rebuild them as
+    needed.
+    """
+    CONFIG = {}
+    def __init__(self, camera, **kwargs):
+        digest_config(self, kwargs)
+        self.camera = camera
+        self.pixel_array = None
+
+    def begin(self, pixel_array):
+        self.pixel_array = pixel_array
+
+    def fill_path(self, coords_list, closed, rgb, opacity):
+        raise Exception("Not implemented")
+
+    def stroke_path(self, coords_list, closed, rgb, width):
+        raise Exception("Not implemented")
+
+    def get_stroke_extent(self, width):
+        """
+        How far (in pixels) beyond the points of its path a stroke
+        of the given width can reach, joins included
+        """
+        return 0.5*width
+
+    def composite_layer(self, rgba_array, box = None):
+        """
+        Lays rgba_array over everything drawn so far.  If box, given as
+        [x_min, y_min, x_max, y_max] (maxes exclusive), is None, then
+        rgba_array has the same shape as the pixel array, otherwise
+        it only covers that box.
+        """
+        self.flush()
+        composite_rgba_array(
+            self.pixel_array, rgba_array, box,
+            self.camera.rgb_max_val,
+            self.camera.get_scratch_buffers(),
+        )
+
+    def flush(self):
+        pass
+
+class AggdrawRasterizer(Rasterizer):
+    CONFIG = {
+        #Parsed aggdraw symbols kept around for paths whose
+        #pixel coordinates haven't changed since an earlier frame
+        "max_cached_symbols" : 5000,
+        #Pens and brushes, by style
+        "max_cached_styles" : 1000,
+        #aggdraw joins strokes with miters, whose tips at sharp
+        #corners reach up to this many half widths past the path
+        #(the default limit of AGG, beyond which they're beveled)
+        "miter_limit" : 4.0,
+    }
+    def __init__(self, camera, **kwargs):
+        Rasterizer.__init__(self, camera, **kwargs)
+        self.canvas = None
+        self.symbol_cache = OrderedDict()
+        self.pens = {}
+        self.brushes = {}
+
+    def begin(self, pixel_array):
+        self.flush()
+        Rasterizer.begin(self, pixel_array)
+
+    def get_canvas(self):
+        if self.canvas is None:
+            image = Image.fromarray(
+                self.pixel_array, mode = self.camera.image_mode
+            )
+            self.canvas = aggdraw.Draw(image)
+        return self.canvas
+
+    def fill_path(self, coords_list, closed, rgb, opacity):
+        brush = self.get_brush(rgb, opacity)
+        symbol = self.get_symbol(coords_list, closed)
+        self.get_canvas().symbol((0, 0), symbol, None, brush)
+
+    def stroke_path(self, coords_list, closed, rgb, width):
+        pen = self.get_pen(rgb, width)
+        symbol = self.get_symbol(coords_list, closed)
+        self.get_canvas().symbol((0, 0), symbol, pen, None)
+
+    def get_stroke_extent(self, width):
+        return 0.5*self.miter_limit*width
+
+    def get_pen(self, rgb, width):
+        key = (tuple(rgb), width)
+        if key not in self.pens:
+            if len(self.pens) >= self.max_cached_styles:
+                self.pens.clear()
+            self.pens[key] = aggdraw.Pen(rgb_to_hex(rgb), width)
+        return self.pens[key]
+
+    def get_brush(self, rgb, opacity):
+        key = (tuple(rgb), opacity)
+        if key not in self.brushes:
+            if len(self.brushes) >= self.max_cached_styles:
+                self.brushes.clear()
+            self.brushes[key] = aggdraw.Brush(
+                rgb_to_hex(rgb), int(self.camera.rgb_max_val*opacity)
+            )
+        return self.brushes[key]
+
+    def flush(self):
+        if self.canvas is not None:
+            self.canvas.flush()
+            self.canvas = None
+
+    def get_symbol(self, coords_list, closed):
+        """
+        Parsing path strings is costly, so symbols are cached by the
+        pixel coordinates they were built from, which accounts for any
+        change to the mobject or the camera alike.
+        """
+        key = (
+            closed,
+            tuple([len(coords) for coords in coords_list]),
+            "".join([coords.tobytes() for coords in coords_list]),
+        )
+        cache = self.symbol_cache
+        if key in cache:
+            #Reinserted below, to mark as recently used
+            symbol = cache.pop(key)
+        else:
+            symbol = aggdraw.Symbol(
+                pixel_coords_to_pathstring(coords_list, closed)
+            )
+        cache[key] = symbol
+        if len(cache) > self.max_cached_symbols:
+            cache.popitem(last = False)
+        return symbol
+
+class NumpyRasterizer(Rasterizer):
+    """
+    Reference backend written purely in terms of numpy.  Curves are
+    flattened into polylines, and each pixel is shaded by how many of
+    its supersampling x supersampling subsamples fall inside the
+    path, under the nonzero winding rule.  Strokes are filled as the
+    union of one rectangle per polyline segment.
+    """
+    CONFIG = {
+        "supersampling" : 4,
+        #Curves are split into pieces at most this many pixels long
+        "max_segment_length" : 2.0,
+        "max_segments_per_curve" : 64,
+        #Bounds memory use when filling large paths
+        "max_samples_per_band" : 2**22,
+    }
+    def fill_path(self, coords_list, closed, rgb, opacity):
+        edges = np.concatenate([
+            get_polygon_edges(polyline)
+            for polyline in self.get_polylines(coords_list)
+        ])
+        self.draw_edges(edges, rgb, opacity)
+
+    def stroke_path(self, coords_list, closed, rgb, width):
+        segments = []
+        for polyline in self.get_polylines(coords_list):
+            if closed:
+                polyline = np.append(polyline, polyline[:1], axis = 0)
+            segments.append(np.array([polyline[:-1], polyline[1:]]))
+        starts, ends = np.concatenate(segments, axis = 1)
+        vects = ends - starts
+        lengths = np.sqrt((vects**2).sum(1))
+        starts, vects, lengths = [
+            arr[lengths > 0]
+            for arr in starts, vects, lengths
+        ]
+        if len(lengths) == 0:
+            return
+        #Each rectangle runs half the width past its segment's
+        #ends, which fills in the joints between segments
+        unit_vects = vects/lengths[:,None]
+        along = 0.5*width*unit_vects
+        across = 0.5*width*np.array([-unit_vects[:,1], unit_vects[:,0]]).T
+        corners = [
+            starts - along + across,
+            starts + vects + along + across,
+            starts + vects + along - across,
+            starts - along - across,
+        ]
+        #Every rectangle winds the same way, so their union
+        #is exactly the region with nonzero winding number
+        edges = np.concatenate([
+            np.array([corners[i], corners[(i+1)%4]]).transpose(1, 0, 2)
+            for i in range(4)
+        ])
+        self.draw_edges(edges, rgb, 1)
+
+    def get_stroke_extent(self, width):
+        #Out to the corners of the rectangles
+        return np.sqrt(0.5)*width
+
+    def get_polylines(self, coords_list):
+        return [
+            flatten_bezier_path(
+                coords.astype('float'),
+                self.max_segment_length,
+                self.max_segments_per_curve,
+            )
+            for coords in coords_list
+        ]
+
+    def draw_edges(self, edges, rgb, opacity):
+        """
+        edges is an array of shape (n, 2, 2), each entry being the
+        start and end of one edge of the (possibly self intersecting)
+        polygon to fill.
+        """
+        height, width = self.pixel_array.shape[:2]
+        xs, ys = edges[:,:,0], edges[:,:,1]
+        x0 = max(int(np.floor(xs.min())), 0)
+        x1 = min(int(np.ceil(xs.max())) + 1, width)
+        y0 = max(int(np.floor(ys.min())), 0)
+        y1 = min(int(np.ceil(ys.max())) + 1, height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        coverage = get_winding_coverage(
+            edges - [x0, y0], x1 - x0, y1 - y0,
+            self.supersampling, self.max_samples_per_band,
+        )
+        composite_over(
+            self.pixel_array[y0:y1, x0:x1],
+            self.camera.rgb_max_val*np.array(rgb, dtype = np.float32),
+            (opacity*coverage).astype(np.float32),
+            self.camera.rgb_max_val,
+            self.camera.get_scratch_buffers(),
+        )
+
+RASTERIZER_CLASSES = OrderedDict([
+    ("aggdraw", AggdrawRasterizer),
+    ("numpy", NumpyRasterizer),
+])
+
+def get_rasterizer_class(name):
+    if name not in RASTERIZER_CLASSES:
+        raise Exception(
+            "Unknown rasterizer %s, expected one of %s"%(
+                name, ", ".join(RASTERIZER_CLASSES.keys())
+            )
+        )
+    return RASTERIZER_CLASSES[name]
+
+class ScratchBuffers(object):
+    """
+    Arrays for intermediate results which are reused from one call to
+    the next, rather than allocated anew each frame.  An array handed
+    out by get is only good until get is next called with that name.
+    """
+    def __init__(self):
+        self.arrays = {}
+
+    def get(self, name, shape, dtype = np.float32):
+        size = int(np.prod(shape))
+        array = self.arrays.get(name)
+        if array is None or array.dtype != dtype or array.size < size:
+            array = np.empty(size, dtype = dtype)
+            self.arrays[name] = array
+        return array[:size].reshape(shape)
+
+def composite_rgba_array(pixel_array, rgba_array, box, rgb_max_val, buffers):
+    """
+    Lays rgba_array over the RGBA array pixel_array in place, as
+    described in Rasterizer.composite_layer.  Only the box around the
+    non-transparent part of rgba_array is worked through.
+    """
+    if box is None:
+        alphas = rgba_array[...,3]
+        rows = np.flatnonzero(alphas.any(1))
+        if len(rows) == 0:
+            return
+        cols = np.flatnonzero(alphas.any(0))
+        x0, y0, x1, y1 = cols[0], rows[0], cols[-1]+1, rows[-1]+1
+        rgba_array = rgba_array[y0:y1, x0:x1]
+    else:
+        x0, y0, x1, y1 = box
+    dst = pixel_array[y0:y1, x0:x1]
+    if rgb_max_val == 255:
+        composite_8_bit(dst, rgba_array, buffers)
+        return
+    src_a = buffers.get("src_a", dst.shape[:2])
+    np.multiply(rgba_array[...,3], np.float32(1.0/rgb_max_val), out = src_a)
+    composite_over(dst, rgba_array[...,:3], src_a, rgb_max_val, buffers)
+
+def composite_8_bit(dst, src, buffers):
+    """
+    Handles each kind of pixel in dst separately: opaque ones with
+    composite_onto_opaque, transparent ones (say, the default
+    background) by copying src, and only those in between in
+    floating point.
+    """
+    dst_a = dst[...,3]
+    is_opaque = (dst_a == 255)
+    if is_opaque.all():
+        composite_onto_opaque(dst, src, buffers)
+        return
+    is_transparent = (dst_a == 0)
+    if is_transparent.all():
+        dst[...] = src
+        return
+    partial_indices = np.nonzero(~(is_opaque | is_transparent))
+    partial_dst = None
+    if len(partial_indices[0]) > 0:
+        #Gathered into (k, 1, 4) arrays, so composite_over can work on them
+        partial_dst = dst[partial_indices][:,None]
+        partial_src = src[partial_indices][:,None]
+        src_a = np.multiply(partial_src[...,3], np.float32(1.0/255))
+        composite_over(partial_dst, partial_src[...,:3], src_a, 255, buffers)
+    #Also writes over the other pixels, which get fixed up below
+    composite_onto_opaque(dst, src, buffers)
+    np.copyto(dst, src, where = is_transparent[...,None])
+    if partial_dst is not None:
+        dst[partial_indices] = partial_dst[:,0]
+
+def composite_onto_opaque(dst, src, buffers):
+    """
+    Fast path for 8 bit colors when every pixel of dst is opaque, so
+    that the output stays opaque and its rgb is just
+    (src_rgb*src_a + dst_rgb*(255 - src_a))/255, all in integers.
+    """
+    shape = dst.shape[:2]
+    alphas = buffers.get("int_a", shape + (1,), np.uint16)
+    alphas[...,0] = src[...,3]
+    out_rgb = buffers.get("int_out_rgb", shape + (3,), np.uint16)
+    np.multiply(src[...,:3], alphas, out = out_rgb)
+    np.subtract(255, alphas, out = alphas)
+    dst_part = buffers.get("int_dst_rgb", shape + (3,), np.uint16)
+    np.multiply(dst[...,:3], alphas, out = dst_part)
+    out_rgb += dst_part
+    out_rgb //= 255
+    dst[...,:3] = out_rgb
+
+def composite_over(dst, src_rgb, src_a, rgb_max_val, buffers):
+    """
+    Lays colors src_rgb (out of rgb_max_val, broadcastable against
+    dst[...,:3]) with alphas src_a (floats between 0 and 1) over the
+    RGBA array dst in place, using buffers for all intermediate
+    results.
+    """
+    shape = dst.shape[:2]
+    #Weight of the destination color, dst_a*(1-src_a)
+    dst_weight = buffers.get("dst_weight", shape + (1,))
+    np.multiply(dst[...,3:], np.float32(1.0/rgb_max_val), out = dst_weight)
+    remaining = buffers.get("remaining", shape + (1,))
+    np.subtract(1, src_a[...,None], out = remaining)
+    dst_weight *= remaining
+    out_a = buffers.get("out_a", shape + (1,))
+    np.add(src_a[...,None], dst_weight, out = out_a)
+
+    out_rgb = buffers.get("out_rgb", shape + (3,))
+    np.multiply(src_rgb, src_a[...,None], out = out_rgb)
+    dst_part = buffers.get("dst_rgb", shape + (3,))
+    np.multiply(dst[...,:3], dst_weight, out = dst_part)
+    out_rgb += dst_part
+    # When the output alpha is 0 for full transparency,
+    # we have a choice over what RGB value to use in our
+    # output representation. Leaving out_rgb as is there
+    # means choosing 0.
+    np.divide(out_rgb, out_a, out = out_rgb, where = out_a > 0)
+
+    dst[...,:3] = out_rgb
+    out_a *= rgb_max_val
+    dst[...,3:] = out_a
+
+#Bernstein polynomials evaluated at evenly spaced values of t,
+#by number of pieces each curve is split into
+BEZIER_SAMPLE_MATRICES = {}
+
+def get_bezier_sample_matrix(num_pieces):
+    if num_pieces not in BEZIER_SAMPLE_MATRICES:
+        t = np.arange(num_pieces, dtype = 'float')/num_pieces
+        BEZIER_SAMPLE_MATRICES[num_pieces] = np.array([
+            (1-t)**3, 3*t*(1-t)**2, 3*(1-t)*t**2, t**3
+        ]).T
+    return BEZIER_SAMPLE_MATRICES[num_pieces]
+
+def flatten_bezier_path(coords, max_segment_length, max_segments_per_curve):
+    """
+    Turns the 3k+1 control points of k cubic Bezier curves into a
+    polyline, splitting every curve into the same number of pieces,
+    enough for the longest curve to be cut into pieces no longer than
+    max_segment_length.
+    """
+    if len(coords) < 4:
+        return coords
+    num_curves = (len(coords)-1)/3
+    control_points = np.array([
+        coords[i::3][:num_curves] for i in range(4)
+    ])
+    #Length of the control polygon bounds that of the curve
+    polygon_lengths = np.sqrt(
+        (np.diff(control_points, axis = 0)**2).sum(2)
+    ).sum(0)
+    num_pieces = int(np.clip(
+        np.ceil(polygon_lengths.max()/max_segment_length),
+        1, max_segments_per_curve
+    ))
+    matrix = get_bezier_sample_matrix(num_pieces)
+    #Dimensions: curve, piece, coordinate
+    samples = np.einsum("pi,icd->cpd", matrix, control_points)
+    return np.append(
+        samples.reshape((num_curves*num_pieces, 2)),
+        coords[-1:], axis = 0
+    )
+
+def get_polygon_edges(polyline):
+    return np.array([
+        polyline, np.roll(polyline, -1, axis = 0)
+    ]).transpose(1, 0, 2)
+
+def get_winding_coverage(edges, width, height, supersampling, max_samples_per_band):
+    """
+    Returns a height x width array giving the fraction of subsamples
+    in each pixel with nonzero winding number about the polygon with
+    the given edges (in pixel coordinates relative to the region).
+
+    Each subsample row gets +1 or -1 (depending on direction) at the
+    first subsample to the right of every edge crossing it, so that
+    cumulative sums along rows give winding numbers.
+    """
+    ss = supersampling
+    num_rows, num_cols = height*ss, width*ss
+    (xa, ya), (xb, yb) = edges[:,0].T, edges[:,1].T
+    dy = yb - ya
+    non_horizontal = dy != 0
+    xa, ya, xb, yb, dy = [
+        arr[non_horizontal]
+        for arr in xa, ya, xb, yb, dy
+    ]
+    #Subsample row j sits at y = (j+0.5)/ss, and is crossed by an
+    #edge when min(ya, yb) <= y < max(ya, yb)
+    row_starts, row_ends = [
+        np.clip(np.ceil(ss*y - 0.5), 0, num_rows).astype('int')
+        for y in np.minimum(ya, yb), np.maximum(ya, yb)
+    ]
+    counts = row_ends - row_starts
+    total = counts.sum()
+    coverage = np.zeros((height, width))
+    if total == 0:
+        return coverage
+    edge_indices = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    rows = row_starts[edge_indices] + np.arange(total) - offsets[edge_indices]
+    sample_ys = (rows + 0.5)/ss
+    crossing_xs = xa[edge_indices] + \
+        (sample_ys - ya[edge_indices])*(xb - xa)[edge_indices]/dy[edge_indices]
+    cols = np.clip(
+        np.ceil(ss*crossing_xs - 0.5), 0, num_cols
+    ).astype('int')
+    directions = np.sign(dy)[edge_indices]
+
+    #Work through bands of pixel rows to bound memory use
+    band_height = max(max_samples_per_band/(ss*(num_cols+1)), 1)
+    order = np.argsort(rows, kind = "mergesort")
+    rows, cols, directions = rows[order], cols[order], directions[order]
+    for band_y0 in range(0, height, band_height):
+        band_y1 = min(band_y0 + band_height, height)
+        lo, hi = np.searchsorted(rows, [ss*band_y0, ss*band_y1])
+        if lo == hi:
+            continue
+        band_rows = ss*(band_y1 - band_y0)
+        deltas = np.bincount(
+            (rows[lo:hi] - ss*band_y0)*(num_cols+1) + cols[lo:hi],
+            weights = directions[lo:hi],
+            minlength = band_rows*(num_cols+1),
+        ).reshape((band_rows, num_cols+1))
+        inside = np.cumsum(deltas[:,:num_cols], axis = 1) != 0
+        coverage[band_y0:band_y1] = inside.reshape(
+            (band_y1 - band_y0, ss, width, ss)
+        ).mean(3).mean(1)
+    return coverage
+
+#Format strings for path strings, by number of coordinates
+PATHSTRING_TEMPLATES = {}
+
+def get_pathstring_template(num_coords, closed):
+    key = (num_coords, closed)
+    if key not in PATHSTRING_TEMPLATES:
+        pieces = ["%d"]*num_coords
+        #Start new path string with M
+        pieces[0] = "M%d"
+        #The C at the start of every 6th number communicates
+        #that the following 6 define a cubic Bezier
+        pieces[2::6] = ["C%d"]*len(pieces[2::6])
+        #Possibly finish with "Z"
+        if closed:
+            pieces[-1] += " Z"
+        PATHSTRING_TEMPLATES[key] = " ".join(pieces)
+    return PATHSTRING_TEMPLATES[key]
+
+def pixel_coords_to_pathstring(coords_list, closed):
+    return "".join([
+        get_pathstring_template(coords.size, closed) % tuple(coords.flatten().tolist())
+        for coords in coords_list
+    ])
@@ -10,10 +10,16 @@ import traceback
 import imp
 import os
 import subprocess as sp
+import multiprocessing as mp
+import json
 
 from helpers import *
 from scene import Scene
+from scene.movie_writer import concatenate_movie_files
 from camera import Camera
+from mobject.tex_mobject import \
+   start_recording_tex_expressions, stop_recording_tex_expressions, \
+   prefetch_tex_expressions
 
 HELP_MESSAGE = """
    Usage:
@@ -28,6 +34,11 @@ HELP_MESSAGE = """
    -q don't print progress
    -f when writing to a movie file, export the frames in png sequence
    -t use transperency when exporting images
+   -c reuse cached partial movies for plays and waits which haven't changed
+   --render_processes N rasterize frames of each play across N processes
+   --processes N split the scene's animations into N chunks rendered in parallel
+   --prefetch_tex N typeset all of the scene's TeX in batches across N processes
+      before rendering (otherwise each TexMobject is typeset as it's made)
 """
 SCENE_NOT_FOUND_MESSAGE = """
    That scene is not in the script
@@ -63,12 +74,17 @@ def get_configuration():
          ("-f", "--show_file_in_finder"),
          ("-t", "--transparent"),
          ("-q", "--quiet"),
-         ("-a", "--write_all")
+         ("-a", "--write_all"),
+         ("-c", "--cache"),
       ]
       for short_arg, long_arg in optional_args:
          parser.add_argument(short_arg, long_arg, action = "store_true")
       parser.add_argument("-o", "--output_name")
       parser.add_argument("-n", "--start_at_animation_number")
+      parser.add_argument("--render_processes", type = int, default = 1)
+      parser.add_argument("--processes", type = int, default = 1)
+      parser.add_argument("--rasterizer")
+      parser.add_argument("--prefetch_tex", type = int, default = 0)
       args = parser.parse_args()
       if args.output_name != None:
          output_name_root, output_name_ext = os.path.splitext(args.output_name)
@@ -102,6 +118,10 @@ def get_configuration():
       "output_name"     : output_name,
       "start_at_animation_number" : args.start_at_animation_number,
       "end_at_animation_number" : None,
+      "num_render_processes" : args.render_processes,
+      "processes"       : args.processes,
+      "use_render_cache" : args.cache,
+      "prefetch_tex_processes" : args.prefetch_tex,
    }
    if args.low_quality:
       config["camera_config"] = LOW_QUALITY_CAMERA_CONFIG
@@ -112,6 +132,10 @@ def get_configuration():
    else:
       config["camera_config"] = PRODUCTION_QUALITY_CAMERA_CONFIG
       config["frame_duration"] = PRODUCTION_QUALITY_FRAME_DURATION
+   if args.rasterizer is not None:
+      config["camera_config"] = dict(
+         config["camera_config"], rasterizer = args.rasterizer
+      )
 
    stan = config["start_at_animation_number"]
    if stan is not None:
@@ -155,6 +179,150 @@ def handle_scene(scene, **config):
       sys.stdout.close()
       sys.stdout = curr_stdout
 
+def render_scene_chunk(SceneClass, scene_kwargs):
+   SceneClass(**scene_kwargs)
+
+def render_scene_in_chunks(SceneClass, scene_kwargs, num_chunks):
+   """
+   Partitions the animations of a scene into num_chunks ranges, each
+   rendered by its own process into a partial movie (fast-forwarding
+   up to its start with skip_animations), then concatenates those
+   partial movies.  Returns the scene instance of the dry run used to
+   count animations, which knows where the full movie lives.
+   """
+   scene = SceneClass(**get_dry_run_kwargs(scene_kwargs))
+   start = scene_kwargs["start_at_animation_number"] or 0
+   end = scene_kwargs["end_at_animation_number"] or scene.num_plays
+   num_chunks = max(min(num_chunks, end - start), 1)
+   boundaries = [
+      start + (count*(end - start))/num_chunks
+      for count in range(num_chunks + 1)
+   ]
+
+   processes = []
+   partial_movie_paths = []
+   for count, (chunk_start, chunk_end) in enumerate(adjacent_pairs(boundaries)[:-1]):
+      is_last_chunk = (count == num_chunks - 1)
+      chunk_kwargs = dict(scene_kwargs)
+      chunk_kwargs.update({
+         "name" : "%s_part%03d"%(str(scene), count),
+         "skip_animations" : chunk_start > 0,
+         "start_at_animation_number" : chunk_start,
+         "end_at_animation_number" : None if is_last_chunk else chunk_end,
+         "add_final_frame" : is_last_chunk,
+      })
+      if is_last_chunk and scene_kwargs["end_at_animation_number"]:
+         chunk_kwargs["end_at_animation_number"] = chunk_end
+      partial_movie_paths.append(
+         scene.get_movie_file_path(chunk_kwargs["name"])
+      )
+      process = mp.Process(
+         target = render_scene_chunk,
+         args = (SceneClass, chunk_kwargs)
+      )
+      process.start()
+      processes.append(process)
+   for process in processes:
+      process.join()
+   if any([process.exitcode != 0 for process in processes]):
+      raise Exception("Rendering a chunk of %s failed"%str(scene))
+
+   concatenate_movie_files(partial_movie_paths, scene.get_movie_file_path())
+   for path in partial_movie_paths:
+      os.remove(path)
+   return scene
+
+def get_dry_run_kwargs(scene_kwargs):
+   result = dict(scene_kwargs)
+   result.update({
+      "skip_animations" : True,
+      "write_to_movie" : False,
+      "start_at_animation_number" : None,
+      "end_at_animation_number" : None,
+   })
+   return result
+
+def get_tex_manifest_path(SceneClass, scene_kwargs):
+   return os.path.join(
+      scene_kwargs["output_directory"], "tex_manifests",
+      SceneClass.__name__ + ".json"
+   )
+
+def load_tex_manifest(SceneClass, scene_kwargs):
+   """
+   Returns the pairs listed in the scene's manifest, or None if it
+   has none, or if any of its templates can't be found
+   """
+   path = get_tex_manifest_path(SceneClass, scene_kwargs)
+   if not os.path.exists(path):
+      return None
+   with open(path, "r") as manifest_file:
+      result = [
+         (
+            expression.encode("utf-8"),
+            os.path.join(THIS_DIR, template_tex_file.encode("utf-8"))
+         )
+         for expression, template_tex_file in json.load(manifest_file)
+      ]
+   for expression, template_tex_file in result:
+      if not os.path.exists(template_tex_file):
+         print("%s from the TeX manifest of %s is missing, ignoring the manifest"%(
+            template_tex_file, SceneClass.__name__
+         ))
+         return None
+   return result
+
+def save_tex_manifest(SceneClass, scene_kwargs, expressions_and_templates):
+   path = get_tex_manifest_path(SceneClass, scene_kwargs)
+   if not os.path.exists(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+   #Templates are stored relative to THIS_DIR, so that the manifest
+   #still works after the checkout moves, or on other machines
+   entries = [
+      (expression, os.path.relpath(template_tex_file, THIS_DIR))
+      for expression, template_tex_file in expressions_and_templates
+   ]
+   temp_path = "%s_%dTemp"%(path, os.getpid())
+   with open(temp_path, "w") as manifest_file:
+      json.dump(entries, manifest_file, indent = 1)
+   os.rename(temp_path, path)
+
+def discover_scene_tex(SceneClass, scene_kwargs):
+   """
+   Runs through the scene with skip_animations and latex stubbed out,
+   returning the (expression, template_tex_file) pairs it asked for.
+   If the scene trips over the placeholder svgs, whatever was found
+   before that is still returned.
+   """
+   start_recording_tex_expressions(stub = True)
+   try:
+      SceneClass(**get_dry_run_kwargs(scene_kwargs))
+   except Exception:
+      print("Dry run of %s failed partway, only prefetching what came before:"%(
+         SceneClass.__name__
+      ))
+      traceback.print_exc()
+   finally:
+      result = stop_recording_tex_expressions()
+   return result
+
+def prefetch_scene_tex(SceneClass, scene_kwargs, num_processes):
+   """
+   Typesets the scene's TeX across num_processes processes, taking
+   what to typeset from the scene's manifest if it has one, or from
+   a dry run if not.
+   """
+   expressions_and_templates = load_tex_manifest(SceneClass, scene_kwargs)
+   if expressions_and_templates is None:
+      expressions_and_templates = discover_scene_tex(SceneClass, scene_kwargs)
+      save_tex_manifest(SceneClass, scene_kwargs, expressions_and_templates)
+   num_typeset = prefetch_tex_expressions(
+      expressions_and_templates, num_processes
+   )
+   print("Prefetched %d of %d TeX expressions for %s"%(
+      num_typeset, len(expressions_and_templates), SceneClass.__name__
+   ))
+
 def is_scene(obj):
    if not inspect.isclass(obj):
       return False
@@ -241,6 +409,8 @@ def main():
          "movie_file_extension",
          "start_at_animation_number",
          "end_at_animation_number",
+         "num_render_processes",
+         "use_render_cache",
       ]
    ])
    
@@ -252,7 +422,29 @@ def main():
       
    for SceneClass in get_scene_classes(scene_names_to_classes, config):
       try:
-         handle_scene(SceneClass(**scene_kwargs), **config)
+         prefetch_tex = config["prefetch_tex_processes"] > 0
+         if prefetch_tex:
+            prefetch_scene_tex(
+               SceneClass, scene_kwargs, config["prefetch_tex_processes"]
+            )
+            #Keeps the manifest current as the scene changes
+            start_recording_tex_expressions()
+         chunked = all([
+            config["processes"] > 1,
+            config["write_to_movie"],
+            not config["show_last_frame"],
+         ])
+         if chunked:
+            scene = render_scene_in_chunks(
+               SceneClass, scene_kwargs, config["processes"]
+            )
+         else:
+            scene = SceneClass(**scene_kwargs)
+         if prefetch_tex:
+            save_tex_manifest(
+               SceneClass, scene_kwargs, stop_recording_tex_expressions()
+            )
+         handle_scene(scene, **config)
          play_finish_sound()
       except:
          print("\n\n")
@@ -258,6 +258,69 @@ def complex_to_R3(complex_num):
 def R3_to_complex(point):
     return complex(*point[:2])
 
+def vectorized_function(function):
+    """
+    Declares that function, normally called on a single input (a point,
+    a number, a complex number...), also accepts an array of N such
+    inputs stacked along the first axis, returning the N outputs stacked
+    the same way, e.g. an (N, 3) array of points for an (N, 3) array of
+    points.  Wherever a function gets mapped over many inputs, like in
+    Mobject.apply_function, one declared this way is called just once.
+    """
+    try:
+        function.is_vectorized = True
+    except AttributeError:
+        #E.g. bound methods
+        original_function = function
+        function = lambda *args : original_function(*args)
+        function.is_vectorized = True
+    return function
+
+def is_vectorized_function(function):
+    return getattr(function, "is_vectorized", False)
+
+def detect_vectorized_function(function, sample_inputs):
+    """
+    Returns function declared with vectorized_function if calling it on
+    the array sample_inputs agrees with calling it on each of its
+    entries in turn, as is the case for functions written purely with
+    numpy ufuncs and arithmetic, and otherwise returns it unchanged.
+    Use more samples than a point has coordinates, so that a function
+    indexing into its input (say p[0]) can't pass by coincidence.
+    """
+    sample_inputs = np.array(sample_inputs)
+    try:
+        with np.errstate(all = "ignore"):
+            expected = np.array([function(x) for x in sample_inputs])
+            result = np.array(function(sample_inputs))
+        if result.shape == expected.shape and np.allclose(result, expected):
+            return vectorized_function(function)
+    except Exception:
+        pass
+    return function
+
+def apply_function_to_points(function, points):
+    """
+    Maps a function of one point over the rows of points
+    """
+    if is_vectorized_function(function):
+        return np.array(function(points))
+    return np.apply_along_axis(function, 1, points)
+
+def complex_function_to_R3_function(function):
+    """
+    Turns a function from C to C into one from R^3 to R^3, sending
+    (x, y, z) to complex_to_R3(function(x+iy)), which is vectorized
+    whenever function is.
+    """
+    if is_vectorized_function(function):
+        def R3_function(points):
+            values = np.array(function(points[:,0] + 1j*points[:,1]), dtype = complex)
+            values = values*np.ones(len(points))
+            return np.transpose([values.real, values.imag, np.zeros(len(points))])
+        return vectorized_function(R3_function)
+    return lambda (x, y, z) : complex_to_R3(function(complex(x, y)))
+
 def tuplify(obj):
     if isinstance(obj, str):
         return (obj,)
@@ -424,6 +487,7 @@ def random_color():
 
 def straight_path(start_points, end_points, alpha):
     return interpolate(start_points, end_points, alpha)
+straight_path.is_pointwise = True
 
 def path_along_arc(arc_angle, axis = OUT):
     """
@@ -442,6 +506,8 @@ def path_along_arc(arc_angle, axis = OUT):
             centers += np.cross(unit_axis, vects/2.0)/np.tan(arc_angle/2)
         rot_matrix = rotation_matrix(alpha*arc_angle, unit_axis)
         return centers + np.dot(start_points-centers, rot_matrix.T)
+    #Each point's path depends on nothing but its own start and end
+    path.is_pointwise = True
     return path
 
 def clockwise_path():
@@ -1,6 +1,7 @@
 import numpy as np
 import itertools as it
 import os
+from collections import OrderedDict
 from PIL import Image
 from random import random
 
@@ -8,6 +9,39 @@ from helpers import *
 from mobject import Mobject
 from point_cloud_mobject import PMobject
 
+class MipmapCache(object):
+    """
+    Downsampled copies of the pixel arrays of image mobjects, shared
+    by all of them, with the least recently used ones evicted once
+    their total size passes max_size_in_bytes.
+    """
+    def __init__(self, max_size_in_bytes):
+        self.max_size_in_bytes = max_size_in_bytes
+        self.arrays = OrderedDict()
+        self.size_in_bytes = 0
+
+    def get(self, key):
+        if key not in self.arrays:
+            return None
+        #Reinserted, to mark as recently used
+        array = self.arrays.pop(key)
+        self.arrays[key] = array
+        return array
+
+    def add(self, key, array):
+        if key in self.arrays:
+            self.size_in_bytes -= self.arrays.pop(key).nbytes
+        self.arrays[key] = array
+        self.size_in_bytes += array.nbytes
+        while self.size_in_bytes > self.max_size_in_bytes and len(self.arrays) > 1:
+            key, evicted = self.arrays.popitem(last = False)
+            self.size_in_bytes -= evicted.nbytes
+
+MIPMAP_CACHE = MipmapCache(max_size_in_bytes = 2**28)
+
+#Keys identifying the contents of an ImageMobject's pixel array
+PIXEL_ARRAY_KEYS = it.count()
+
 class ImageMobject(Mobject):
     """
     Automatically filters out black pixels
@@ -30,9 +64,58 @@ class ImageMobject(Mobject):
             self.pixel_array = np.array(filename_or_array)
         self.change_to_rgba_array()
         if self.invert:
-            self.pixel_array[:,:,:3] = 255-self.pixel_array[:,:,:3]
+            pixel_array = np.array(self.pixel_array)
+            pixel_array[:,:,:3] = 255-pixel_array[:,:,:3]
+            self.pixel_array = pixel_array
         Mobject.__init__(self, **kwargs)
 
+    #pixel_array lives in __dict__, but goes through this property
+    #so that mipmaps made from an old array won't get used.  Like
+    #points, it's kept as a read only view, so edits have to go
+    #into a copy which then gets assigned.
+    @property
+    def pixel_array(self):
+        try:
+            return self.__dict__["pixel_array"]
+        except KeyError:
+            raise AttributeError("pixel_array")
+
+    @pixel_array.setter
+    def pixel_array(self, pixel_array):
+        if isinstance(pixel_array, np.ndarray):
+            pixel_array = pixel_array.view()
+            pixel_array.flags.writeable = False
+        self.__dict__["pixel_array"] = pixel_array
+        self.refresh_pixel_array_key()
+
+    def refresh_pixel_array_key(self):
+        self._pixel_array_key = next(PIXEL_ARRAY_KEYS)
+
+    def get_pixel_array_key(self):
+        if "_pixel_array_key" not in self.__dict__:
+            self.refresh_pixel_array_key()
+        return self._pixel_array_key
+
+    def get_max_mipmap_level(self):
+        h, w = self.pixel_array.shape[:2]
+        return int(np.log2(min(h, w)))
+
+    def get_mipmap(self, level):
+        """
+        Returns pixel_array shrunk by a factor of 2**level along both
+        dimensions (level 0 being pixel_array itself), by averaging
+        2x2 blocks of the level below.  Levels are kept in MIPMAP_CACHE.
+        """
+        level = min(level, self.get_max_mipmap_level())
+        if level <= 0:
+            return self.pixel_array
+        key = (self.get_pixel_array_key(), level)
+        mipmap = MIPMAP_CACHE.get(key)
+        if mipmap is None:
+            mipmap = downsample_rgba_array(self.get_mipmap(level - 1))
+            MIPMAP_CACHE.add(key, mipmap)
+        return mipmap
+
     def change_to_rgba_array(self):
         pa = self.pixel_array
         if len(pa.shape) == 2:
@@ -49,9 +132,11 @@ class ImageMobject(Mobject):
 
     def highlight(self, color, alpha = None, family = True):
         rgb = color_to_int_rgb(color)
-        self.pixel_array[:,:,:3] = rgb
+        pixel_array = np.array(self.pixel_array)
+        pixel_array[:,:,:3] = rgb
         if alpha is not None:
-            self.pixel_array[:,:,3] = int(255*alpha)
+            pixel_array[:,:,3] = int(255*alpha)
+        self.pixel_array = pixel_array
         for submob in self.submobjects:
             submob.highlight(color, alpha, family)
         return self
@@ -69,8 +154,28 @@ class ImageMobject(Mobject):
         h, w = self.pixel_array.shape[:2]
         self.stretch_to_fit_width(self.height*w/h)
 
+    def get_own_points_box(self):
+        """
+        Covers the whole parallelogram the image is drawn on, whose
+        fourth corner isn't among its points, UR + DL - UL.
+        """
+        version = self.get_points_version()
+        cached = self.__dict__.get("_points_box")
+        if cached is None or cached[0] != version:
+            points = self.points
+            if len(points) == 3:
+                ul, ur, dl = points
+                points = np.array([ul, ur, dl, ur + dl - ul])
+            box = None
+            if len(points) > 0:
+                box = np.array([np.min(points, 0), np.max(points, 0)])
+            self._points_box = cached = (version, box)
+        return cached[1]
+
     def set_opacity(self, alpha):
-        self.pixel_array[:,:,3] = int(255*alpha)
+        pixel_array = np.array(self.pixel_array)
+        pixel_array[:,:,3] = int(255*alpha)
+        self.pixel_array = pixel_array
         return self
 
     def fade(self, darkness = 0.5):
@@ -83,7 +188,19 @@ class ImageMobject(Mobject):
             mobject1.pixel_array, mobject2.pixel_array, alpha
         ).astype(self.pixel_array_dtype)
 
-    def copy(self):
-        return self.deepcopy()
-
-
+def downsample_rgba_array(rgba_array):
+    """
+    Halves both dimensions of rgba_array (dropping a last odd row or
+    column), averaging colors weighted by alpha so that transparent
+    pixels don't darken their neighbors.
+    """
+    h, w = rgba_array.shape[:2]
+    blocks = rgba_array[:2*(h/2), :2*(w/2)].astype('float')
+    blocks = blocks.reshape((h/2, 2, w/2, 2, rgba_array.shape[2]))
+    alphas = blocks[...,3:]
+    alpha_sums = alphas.sum(3).sum(1)
+    rgb_sums = (blocks[...,:3]*alphas).sum(3).sum(1)
+    result = np.zeros((h/2, w/2, rgba_array.shape[2]))
+    result[...,:3] = fdiv(rgb_sums, alpha_sums, zero_over_zero_value = 0)
+    result[...,3:] = alpha_sums/4
+    return result.astype(rgba_array.dtype)
@@ -2,6 +2,8 @@ import numpy as np
 import operator as op
 import os
 import copy
+import types
+import weakref
 from PIL import Image
 from colour import Color
 
@@ -11,9 +13,92 @@ from container import *
 
 #TODO: Explain array_attrs
 
+#Bumped whenever submobjects change anywhere, or a mobject's points go
+#from empty to nonempty or back, which invalidates all cached results of
+#submobject_family and family_members_with_points, along with all cached
+#family bounding boxes.  Changes to points alone only invalidate the
+#boxes of the mobject and its ancestors (see handle_points_change).
+_family_epoch = 0
+
+def invalidate_families():
+    global _family_epoch
+    _family_epoch += 1
+
+def invalidating_list_method(method_name):
+    list_method = getattr(list, method_name)
+    def method(self, *args, **kwargs):
+        result = list_method(self, *args, **kwargs)
+        invalidate_families()
+        return result
+    method.__name__ = method_name
+    return method
+
+class SubmobjectList(list):
+    """
+    List which invalidates cached families and bounding boxes
+    whenever it's mutated
+    """
+    append = invalidating_list_method("append")
+    extend = invalidating_list_method("extend")
+    insert = invalidating_list_method("insert")
+    remove = invalidating_list_method("remove")
+    pop = invalidating_list_method("pop")
+    reverse = invalidating_list_method("reverse")
+    sort = invalidating_list_method("sort")
+    __setitem__ = invalidating_list_method("__setitem__")
+    __delitem__ = invalidating_list_method("__delitem__")
+    __setslice__ = invalidating_list_method("__setslice__")
+    __delslice__ = invalidating_list_method("__delslice__")
+    __iadd__ = invalidating_list_method("__iadd__")
+    __imul__ = invalidating_list_method("__imul__")
+
+def invalidate_family_bounding_boxes(mobjects):
+    """
+    Drops the cached family bounding boxes of mobjects, along with
+    those of everything whose box was worked out from theirs.
+    """
+    #Parents register themselves when working out their family
+    #boxes from a submobject's, and since a parent's box can only be
+    #cached while its children's are, the walk stops at any
+    #mobject without one
+    mobs = list(mobjects)
+    while len(mobs) > 0:
+        mob = mobs.pop()
+        if mob.__dict__.pop("_family_bounding_box", None) is None:
+            continue
+        mobs += list(mob.__dict__.get("_bounding_box_parents", []))
+
+class PackedPoints(object):
+    """
+    Buffer from Mobject.pack_family_points holding the points of each
+    of mobjects, the family members of root with points, in order.
+    Everything in root's family refers to it as _points_pack, and has
+    its version as part of its points version, so that one edit to the
+    whole buffer invalidates everything cached from their points.
+    """
+    def __init__(self, root, buffer, mobjects):
+        self.root = root
+        self.buffer = buffer
+        self.mobjects = mobjects
+        self.family_epoch = _family_epoch
+        self.version = 0
+        #Cleared once some member's points get reassigned
+        self.is_valid = True
+        #Mobjects outside root's family whose family bounding
+        #boxes were worked out from those of members
+        self.outside_parents = weakref.WeakSet()
+
 class Mobject(Container):
     """
     Mathematical Object
+
+    Bounding boxes, and much else worked out from points, are cached
+    until points get assigned again, so mob.points is handed out read
+    only.  To edit points, assign a new array, as in
+
+        points = np.array(mob.points)
+        points[0] = point
+        mob.points = points
     """
     CONFIG = {
         "color" : WHITE,
@@ -37,6 +122,68 @@ class Mobject(Container):
     def __str__(self):
         return str(self.name)
 
+    #Points and submobjects live in __dict__ under their own names, but
+    #go through these properties so that cached families and bounding
+    #boxes get recomputed.  Points are kept as a read only view, since
+    #editing them in place (e.g. mob.points[0] = point) would bypass this.
+    @property
+    def points(self):
+        try:
+            return self.__dict__["points"]
+        except KeyError:
+            raise AttributeError("points")
+
+    @points.setter
+    def points(self, points):
+        if isinstance(points, np.ndarray):
+            points = points.view()
+            points.flags.writeable = False
+        old_points = self.__dict__.get("points")
+        self.__dict__["points"] = points
+        pack = self.__dict__.pop("_points_pack", None)
+        if pack is not None:
+            #These points no longer live in its buffer
+            pack.is_valid = False
+        self.handle_points_change()
+        if old_points is None or (len(old_points) == 0) != (len(points) == 0):
+            invalidate_families()
+
+    def handle_points_change(self):
+        """
+        Invalidates everything cached from this mobject's points,
+        namely anything keyed by its points version (like its own
+        bounding box), and the family bounding boxes of it and its
+        ancestors.  Assigning points does this.
+        """
+        self._points_version = self.__dict__.get("_points_version", 0) + 1
+        invalidate_family_bounding_boxes([self])
+        return self
+
+    def get_points_version(self):
+        """
+        Changes whenever this mobject's points do, whether they're
+        assigned or edited through a packed buffer.
+        """
+        version = self.__dict__.get("_points_version", 0)
+        pack = self.__dict__.get("_points_pack")
+        if pack is None:
+            return version
+        return (version, pack.version)
+
+    @property
+    def submobjects(self):
+        try:
+            return self.__dict__["submobjects"]
+        except KeyError:
+            raise AttributeError("submobjects")
+
+    @submobjects.setter
+    def submobjects(self, submobjects):
+        if not isinstance(submobjects, SubmobjectList):
+            submobjects = SubmobjectList(submobjects)
+        self.__dict__["submobjects"] = submobjects
+        invalidate_families()
+
     def init_points(self):
         self.points = np.zeros((0, self.dim))
 
@@ -101,24 +248,115 @@ class Mobject(Container):
         )
 
     def copy(self):
-        #TODO, either justify reason for shallow copy, or
-        #remove this redundancy everywhere
-        return self.deepcopy()
+        """
+        Copies numpy arrays (e.g. points) and the submobject tree, but
+        shares everything else, like colors and CONFIG derived values,
+        with the original, which is far cheaper than deepcopy.
+
+        Mobjects held in attributes, or inside lists, tuples, dicts and
+        object arrays held in attributes (say the named parts of a
+        PiCreature), are copied through the same memo as submobjects,
+        so they end up pointing into the copied tree rather than the
+        original.  A subclass holding mobjects anywhere else should
+        override copy_with_memo, call the version here, then replace
+        those references using copy_mobject_attr(value, memo).
+        """
+        return self.copy_with_memo({})
 
+    def copy_with_memo(self, memo):
+        if id(self) in memo:
+            return memo[id(self)]
         copy_mobject = copy.copy(self)
-        copy_mobject.points = np.array(self.points)
-        copy_mobject.submobjects = [
-            submob.copy() for submob in self.submobjects
-        ]
-        family = self.submobject_family()
+        memo[id(self)] = copy_mobject
+        #Caches, which would be invalidated anyway, go before anything
+        #is assigned, since setters (like that of points) touch them
+        for attr in self.__dict__.keys():
+            if attr.startswith("_"):
+                del copy_mobject.__dict__[attr]
         for attr, value in self.__dict__.items():
-            if isinstance(value, Mobject) and value in family and value is not self:
-                setattr(copy_mobject, attr, value.copy())
+            if not attr.startswith("_"):
+                setattr(copy_mobject, attr, copy_mobject_attr(value, memo))
         return copy_mobject
 
     def deepcopy(self):
         return copy.deepcopy(self)
 
+    def __deepcopy__(self, memo):
+        #Like copy_with_memo, leaves caches behind, since they may
+        #hold (say) views into buffers of the original
+        copy_mobject = copy.copy(self)
+        memo[id(self)] = copy_mobject
+        for attr in self.__dict__.keys():
+            if attr.startswith("_"):
+                del copy_mobject.__dict__[attr]
+        for attr, value in self.__dict__.items():
+            if not attr.startswith("_"):
+                #Through setters, which (say) make points read only
+                setattr(copy_mobject, attr, copy.deepcopy(value, memo))
+        return copy_mobject
+
+    def pack_family_points(self):
+        """
+        Moves the points of all family members into one contiguous
+        (N, dim) buffer, with each member's points becoming a view
+        into it, so that shift, scale, rotate, apply_matrix, etc. on the
+        whole family become a single numpy operation, as does updating
+        the family in a Transform.
+
+        Nothing else needs to know about this: reassigning some member's
+        points (or changing the family) just means later operations go
+        back to looping over members, until this is called again.
+        Copies (deep or not) start out unpacked.
+        """
+        mobs = self.family_members_with_points()
+        if len(mobs) == 0:
+            return self
+        lengths = [len(mob.points) for mob in mobs]
+        buffer = np.concatenate([mob.points for mob in mobs]).astype('float')
+        offsets = np.cumsum([0] + lengths)
+        for mob, start, end in zip(mobs, offsets, offsets[1:]):
+            mob.points = buffer[start:end]
+        pack = PackedPoints(self, buffer, mobs)
+        family = self.submobject_family()
+        for mob in family:
+            mob._points_pack = pack
+        #Parents from outside the family which already worked out
+        #their boxes from members' need to hear about packed edits
+        for mob in family:
+            for parent in mob.__dict__.get("_bounding_box_parents", []):
+                if parent.__dict__.get("_points_pack") is not pack:
+                    pack.outside_parents.add(parent)
+        return self
+
+    def get_packed_points(self):
+        """
+        Returns the buffer from pack_family_points, provided it still
+        holds the points of the whole family, else None.  Anything
+        writing to it has to call handle_packed_points_change after.
+        """
+        pack = self.__dict__.get("_points_pack")
+        if pack is None or pack.root is not self or not pack.is_valid:
+            return None
+        if pack.family_epoch != _family_epoch:
+            #Some family somewhere changed, perhaps this one
+            mobs = self.family_members_with_points()
+            pack.is_valid = len(mobs) == len(pack.mobjects) and all([
+                mob1 is mob2
+                for mob1, mob2 in zip(mobs, pack.mobjects)
+            ])
+            if not pack.is_valid:
+                return None
+            pack.family_epoch = _family_epoch
+        return pack.buffer
+
+    def handle_packed_points_change(self):
+        #The buffer was written to directly, which changes the points
+        #version of every family member at once
+        pack = self._points_pack
+        pack.version += 1
+        invalidate_family_bounding_boxes([self] + list(pack.outside_parents))
+        return self
+
     def generate_target(self, use_deepcopy = False):
         self.target = None #Prevent exponential explosion
         if use_deepcopy:
@@ -135,9 +373,13 @@ class Mobject(Container):
 
     def shift(self, *vectors):
         total_vector = reduce(op.add, vectors)
+        packed_points = self.get_packed_points()
+        if packed_points is not None:
+            packed_points += total_vector
+            self.handle_packed_points_change()
+            return self
         for mob in self.family_members_with_points():
-           mob.points = mob.points.astype('float')
-           mob.points += total_vector
+            mob.points = mob.points.astype('float') + total_vector
         return self
 
     def scale(self, scale_factor, **kwargs):
@@ -181,7 +423,7 @@ class Mobject(Container):
         if len(kwargs) == 0:
             kwargs["about_point"] = ORIGIN
         self.apply_points_function_about_point(
-            lambda points : np.apply_along_axis(function, 1, points),
+            lambda points : apply_function_to_points(function, points),
             **kwargs
         )
         return self
@@ -201,7 +443,7 @@ class Mobject(Container):
 
     def apply_complex_function(self, function, **kwargs):
         return self.apply_function(
-            lambda (x, y, z) : complex_to_R3(function(complex(x, y))),
+            complex_function_to_R3_function(function),
             **kwargs
         )
 
@@ -211,7 +453,7 @@ class Mobject(Container):
             alphas -= min(alphas)
             alphas /= max(alphas)
             alphas = alphas**wag_factor
-            mob.points += np.dot(
+            mob.points = mob.points + np.dot(
                 alphas.reshape((len(alphas), 1)),
                 np.array(direction).reshape((1, mob.dim))
             )
@@ -244,10 +486,15 @@ class Mobject(Container):
     def apply_points_function_about_point(self, func, about_point = None, about_edge = ORIGIN):
         if about_point is None:
             about_point = self.get_critical_point(about_edge)
+        packed_points = self.get_packed_points()
+        if packed_points is not None:
+            packed_points -= about_point
+            packed_points[:] = func(packed_points)
+            packed_points += about_point
+            self.handle_packed_points_change()
+            return self
         for mob in self.family_members_with_points():
-            mob.points -= about_point
-            mob.points = func(mob.points)
-            mob.points += about_point
+            mob.points = func(mob.points - about_point) + about_point
         return self
 
     def rotate_in_place(self, angle, axis = OUT):
@@ -595,20 +842,87 @@ class Mobject(Container):
     def get_num_points(self):
         return len(self.points)
 
+    def get_own_bounding_box(self):
+        """
+        Returns [mins, maxes] over this mobject's own boundary points,
+        or None if it has none.  Cached until points change.
+        """
+        version = self.get_points_version()
+        cached = self.__dict__.get("_bounding_box")
+        if cached is None or cached[0] != version:
+            points = self.get_points_defining_boundary()
+            if len(points) == 0:
+                box = None
+            else:
+                box = np.array([np.min(points, 0), np.max(points, 0)])
+            self._bounding_box = cached = (version, box)
+        return cached[1]
+
+    def get_own_points_box(self):
+        """
+        Returns [mins, maxes] over all of this mobject's own points
+        (unlike get_own_bounding_box, that includes the handles of
+        vmobjects, so it bounds everything drawn), or None if it has
+        none.  Cached until points change.
+        """
+        version = self.get_points_version()
+        cached = self.__dict__.get("_points_box")
+        if cached is None or cached[0] != version:
+            points = self.points
+            if len(points) == 0:
+                box = None
+            else:
+                box = np.array([np.min(points, 0), np.max(points, 0)])
+            self._points_box = cached = (version, box)
+        return cached[1]
+
+    def get_bounding_box(self):
+        """
+        Returns [mins, maxes] over the boundary points of the whole
+        family, merged from the (cached) boxes of the submobjects.
+        A family without points gets a box of zeros.  The result is
+        shared with the cache, so don't modify it.
+        """
+        #Being keyed by points version too, boxes within a packed
+        #family all go stale with one edit to its buffer
+        key = (_family_epoch, self.get_points_version())
+        cached = self.__dict__.get("_family_bounding_box")
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        pack = self.__dict__.get("_points_pack")
+        boxes = []
+        for submob in self.submobjects:
+            boxes.append(submob.get_bounding_box())
+            #So that changes to submob's points reach this box
+            if "_bounding_box_parents" not in submob.__dict__:
+                submob._bounding_box_parents = weakref.WeakSet()
+            submob._bounding_box_parents.add(self)
+            submob_pack = submob.__dict__.get("_points_pack")
+            if submob_pack is not None and submob_pack is not pack:
+                submob_pack.outside_parents.add(self)
+        own_box = self.get_own_bounding_box()
+        if own_box is not None:
+            boxes.append(own_box)
+        if len(boxes) == 0:
+            result = np.zeros((2, self.dim))
+        else:
+            result = np.array([
+                np.min([box[0] for box in boxes], 0),
+                np.max([box[1] for box in boxes], 0),
+            ])
+        self._family_bounding_box = (key, result)
+        return result
+
     def get_critical_point(self, direction):
+        mins, maxes = self.get_bounding_box()
         result = np.zeros(self.dim)
         for dim in range(self.dim):
-            if direction[dim] <= 0:
-                min_point = self.reduce_across_dimension(np.min, np.min, dim)
-            if direction[dim] >= 0:
-                max_point = self.reduce_across_dimension(np.max, np.max, dim)
-
             if direction[dim] == 0:
-                result[dim] = (max_point+min_point)/2
+                result[dim] = (maxes[dim]+mins[dim])/2
             elif direction[dim] < 0:
-                result[dim] = min_point
+                result[dim] = mins[dim]
             else:
-                result[dim] = max_point
+                result[dim] = maxes[dim]
         return result
 
     # Pseudonyms for more general get_critical_point method
@@ -647,10 +961,8 @@ class Mobject(Container):
         return self.get_edge_center(IN)
 
     def length_over_dim(self, dim):
-        return (
-            self.reduce_across_dimension(np.max, np.max, dim) -
-            self.reduce_across_dimension(np.min, np.min, dim)
-        )
+        mins, maxes = self.get_bounding_box()
+        return maxes[dim] - mins[dim]
 
     def get_width(self):
         return self.length_over_dim(0)
@@ -688,15 +1000,22 @@ class Mobject(Container):
         return result + self.submobjects
 
     def submobject_family(self):
-        sub_families = map(Mobject.submobject_family, self.submobjects)
-        all_mobjects = [self] + list(it.chain(*sub_families))
-        return remove_list_redundancies(all_mobjects)
+        if self.__dict__.get("_submobject_family_epoch") != _family_epoch:
+            sub_families = map(Mobject.submobject_family, self.submobjects)
+            all_mobjects = [self] + list(it.chain(*sub_families))
+            self._submobject_family = remove_list_redundancies(all_mobjects)
+            self._submobject_family_epoch = _family_epoch
+        #Copied, so callers are free to modify the result
+        return list(self._submobject_family)
 
     def family_members_with_points(self):
-        return filter(
-            lambda m : m.get_num_points() > 0,
-            self.submobject_family()
-        )
+        if self.__dict__.get("_family_members_with_points_epoch") != _family_epoch:
+            self._family_members_with_points = filter(
+                lambda m : m.get_num_points() > 0,
+                self.submobject_family()
+            )
+            self._family_members_with_points_epoch = _family_epoch
+        return list(self._family_members_with_points)
 
     def arrange_submobjects(self, direction = RIGHT, center = True, **kwargs):
         for m1, m2 in zip(self.submobjects, self.submobjects[1:]):
@@ -845,6 +1164,37 @@ class Mobject(Container):
     def pointwise_become_partial(self, mobject, a, b):
         pass #To implement in subclass
 
+def copy_mobject_attr(value, memo):
+    """
+    Helper for Mobject.copy_with_memo
+    """
+    if isinstance(value, Mobject):
+        return value.copy_with_memo(memo)
+    if isinstance(value, np.ndarray):
+        if value.dtype != object:
+            return np.array(value)
+        result = np.empty(value.shape, dtype = object)
+        for index, item in np.ndenumerate(value):
+            result[index] = copy_mobject_attr(item, memo)
+        return result
+    if isinstance(value, list) or type(value) is tuple:
+        #List subclasses (like SubmobjectList) come back as plain
+        #lists, which the submobjects setter wraps again
+        result = [copy_mobject_attr(item, memo) for item in value]
+        if isinstance(value, tuple):
+            return tuple(result)
+        return result
+    if type(value) is dict:
+        return dict([
+            (key, copy_mobject_attr(item, memo))
+            for key, item in value.items()
+        ])
+    if isinstance(value, types.MethodType) and isinstance(value.__self__, Mobject):
+        return types.MethodType(
+            value.__func__, value.__self__.copy_with_memo(memo)
+        )
+    return value
+
 class Group(Mobject):
     #Alternate name to improve readibility in cases where
     #the mobject is used primarily for its submobject housing
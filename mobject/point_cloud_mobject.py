@@ -74,7 +74,7 @@ class PMobject(Mobject):
 
     def filter_out(self, condition):
         for mob in self.family_members_with_points():
-            to_eliminate = ~np.apply_along_axis(condition, 1, mob.points)
+            to_eliminate = ~apply_function_to_points(condition, mob.points)
             mob.points = mob.points[to_eliminate]
             mob.rgbas = mob.rgbas[to_eliminate]
         return self
@@ -98,7 +98,7 @@ class PMobject(Mobject):
         """
         for mob in self.family_members_with_points():
             indices = np.argsort(
-                np.apply_along_axis(function, 1, mob.points)
+                apply_function_to_points(function, mob.points)
             )
             mob.apply_over_attr_arrays(lambda arr : arr[indices])
         return self
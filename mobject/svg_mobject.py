@@ -31,6 +31,8 @@ class SVGMobject(VMobject):
         digest_config(self, kwargs, locals())
         self.ensure_valid_file()
         VMobject.__init__(self, **kwargs)
+        #So that the many paths of an svg move, scale, etc. together
+        self.pack_family_points()
         self.move_into_position()
 
     def ensure_valid_file(self):
@@ -87,12 +89,27 @@ class SVGMobject(VMobject):
             pass ##TODO
             # warnings.warn("Unknown element type: " + element.tagName)
         result = filter(lambda m : m is not None, result)
+        self.record_fill_colors(element, result)
         self.handle_transforms(element, VMobject(*result))
         if len(result) > 1 and not self.unpack_groups:
             result = [VGroup(*result)]
 
         return result
 
+    def record_fill_colors(self, element, mobjects):
+        """
+        Notes the fill each mobject would get from the svg as
+        svg_fill_color, without applying it.  Elements are handled
+        from the inside out, so inner fills take precedence.
+        """
+        if not element.hasAttribute("fill"):
+            return
+        fill = element.getAttribute("fill")
+        for mob in mobjects:
+            for submob in mob.submobject_family():
+                if getattr(submob, "svg_fill_color", None) is None:
+                    submob.svg_fill_color = fill
+
     def g_to_mobjects(self, g_element):
         mob = VMobject(*self.get_mobjects_from(g_element))
         self.handle_transforms(g_element, mob)
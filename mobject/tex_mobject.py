@@ -5,6 +5,7 @@ from svg_mobject import SVGMobject, VMobjectFromSVGPathstring
 from topics.geometry import BackgroundRectangle
 
 import collections
+import hashlib
 import sys
 
 TEX_MOB_SCALE_FACTOR = 0.05
@@ -38,6 +39,9 @@ class TexMobject(SVGMobject):
         "organize_left_to_right" : False,
         "propagate_style_to_family" : True,
         "alignment" : "",
+        #Find the parts of multi-arg expressions from colors
+        #marking each arg, rather than typesetting each
+        "split_args_by_color_markers" : True,
     }
     def __init__(self, *args, **kwargs):
         digest_config(self, kwargs, locals())
@@ -51,14 +55,37 @@ class TexMobject(SVGMobject):
         ##
         assert(all([isinstance(a, str) for a in self.args]))
         self.tex_string = self.get_modified_expression()
-        file_name = tex_to_svg_file(
-            self.tex_string,
-            self.template_tex_file
-        )
+        file_name = None
+        self.has_color_markers = False
+        use_color_markers = all([
+            len(self.args) > 1,
+            self.split_args_by_color_markers,
+            self.can_split_by_color_markers(),
+        ])
+        if use_color_markers:
+            try:
+                file_name = tex_to_svg_file(
+                    self.get_marked_expression(),
+                    self.template_tex_file
+                )
+                self.has_color_markers = True
+            except Exception as error:
+                print("Typesetting %s with color markers failed (%s), "
+                      "typesetting its parts separately"%(self.args, error))
+        if file_name is None:
+            if len(self.args) > 1:
+                self.queue_arg_expressions()
+            queue_tex_expression(self.tex_string, self.template_tex_file)
+            file_name = tex_to_svg_file(
+                self.tex_string,
+                self.template_tex_file
+            )
         SVGMobject.__init__(self, file_name = file_name, **kwargs)
         self.scale(TEX_MOB_SCALE_FACTOR)
         if self.organize_left_to_right:
             self.organize_submobjects_left_to_right()
+            #Since the family's order changed
+            self.pack_family_points()
 
     def path_string_to_mobject(self, path_string):
         #Overwrite superclass default to use
@@ -70,14 +97,64 @@ class TexMobject(SVGMobject):
         if len(self.args) > 1:
             self.handle_multiple_args()
 
-    def get_modified_expression(self):
-        result = self.arg_separator.join(self.args)
-        result = " ".join([self.alignment, result])
+    def get_modified_expression(self, args = None, alignment = None):
+        if args is None:
+            args = self.args
+        if alignment is None:
+            alignment = self.alignment
+        result = self.arg_separator.join(args)
+        result = " ".join([alignment, result])
         result = result.strip()
         result = self.modify_special_strings(result)
 
         return result
 
+    def can_split_by_color_markers(self):
+        """
+        Markers go between args, which changes the output whenever an
+        arg attaches to the end of the one before it (sub and
+        superscripts, primes, limits, macro arguments) or has braces
+        matched in another arg, so such expressions get split by
+        typesetting each arg instead
+        """
+        for arg in self.args:
+            unescaped = arg.replace("\\{", "").replace("\\}", "")
+            if unescaped.count("{") != unescaped.count("}"):
+                return False
+        for prev_arg, arg in zip(self.args, self.args[1:]):
+            prev_arg, arg = prev_arg.rstrip(), arg.lstrip()
+            if arg.startswith(("^", "_", "'", "\\limits", "\\nolimits")):
+                return False
+            if prev_arg.endswith(("^", "_")):
+                return False
+            if arg.startswith(("{", "[")) and re.search("\\\\[a-zA-Z]+$", prev_arg):
+                return False
+        return True
+
+    def get_marked_expression(self):
+        """
+        The expression with each arg drawn in a color encoding its
+        index, which dvisvgm carries through to the svg's fills
+        """
+        return self.get_modified_expression([
+            "%s%s%s"%(get_color_marker(index), arg, COLOR_MARKER_END)
+            for index, arg in enumerate(self.args)
+        ])
+
+    def queue_arg_expressions(self):
+        """
+        Queues what handle_multiple_args will typeset for each arg,
+        so that it all goes through latex in one batch with the
+        whole expression
+        """
+        config = dict(TexMobject.CONFIG)
+        config.update(self.CONFIG)
+        for arg in self.args:
+            queue_tex_expression(
+                self.get_modified_expression([arg], config["alignment"]),
+                config["template_tex_file"]
+            )
+
     def modify_special_strings(self, tex):
         tex = self.remove_stray_braces(tex)
         if tex in ["\\over", "\\overline"]:
@@ -122,6 +199,53 @@ class TexMobject(SVGMobject):
         Reorganize existing submojects one layer
         deeper based on the structure of args (as a list of strings)
         """
+        if self.has_color_markers and self.split_submobjects_by_color_markers():
+            return self
+        return self.split_submobjects_by_typesetting_args()
+
+    def split_submobjects_by_color_markers(self):
+        """
+        Groups submobjects by the arg their color marker points
+        to, returning False if the svg has no markers.  Unmarked
+        glyphs (say, from the separators) go with the arg before.
+        """
+        indices = [
+            get_color_marker_index(getattr(submob, "svg_fill_color", None))
+            for submob in self.submobjects
+        ]
+        indices = [
+            index if index is not None and index < len(self.args) else None
+            for index in indices
+        ]
+        known_indices = filter(lambda index : index is not None, indices)
+        if len(known_indices) == 0:
+            return False
+        glyphs_by_arg = [[] for arg in self.args]
+        curr_index = known_indices[0]
+        for index, submob in zip(indices, self.submobjects):
+            if index is not None:
+                curr_index = index
+            glyphs_by_arg[curr_index].append(submob)
+
+        self.expression_parts = list(self.args)
+        new_submobjects = []
+        last_glyph = self.submobjects[0]
+        for expr, glyphs in zip(self.args, glyphs_by_arg):
+            part = TexMobjectPart(expr, **self.CONFIG)
+            if len(glyphs) == 0:
+                glyphs = [VectorizedPoint(last_glyph.get_right())]
+            else:
+                last_glyph = glyphs[-1]
+            part.submobjects = glyphs
+            new_submobjects.append(part)
+        self.submobjects = new_submobjects
+        return True
+
+    def split_submobjects_by_typesetting_args(self):
+        """
+        Counts the glyphs of each arg by typesetting it on its own,
+        and takes that many submobjects for it
+        """
         new_submobjects = []
         curr_index = 0
         self.expression_parts = list(self.args)
@@ -212,6 +336,19 @@ class TexMobject(SVGMobject):
         self.submobjects = [self.background_rectangle, letters]
         return self
 
+class TexMobjectPart(TexMobject):
+    """
+    Part of a multi-arg TexMobject, which gets glyphs from the
+    whole rather than being typeset itself
+    """
+    def __init__(self, tex_string, **kwargs):
+        self.args = [tex_string]
+        self.tex_string = tex_string
+        VMobject.__init__(self, **kwargs)
+
+    def generate_points(self):
+        pass
+
 class TextMobject(TexMobject):
     CONFIG = {
         "template_tex_file" : TEMPLATE_TEXT_FILE,
@@ -317,25 +454,151 @@ class BulletedList(TextMobject):
 
 ##########
 
+#Color markers
+#
+#Arg i of a multi-arg expression is drawn in the color with
+#value i+1, so unmarked glyphs (black) are told apart.  Components
+#are nudged off of multiples of 1/255, so that rounding and
+#truncating them back to bytes agree.
+
+COLOR_MARKER_END = "\\special{color pop}"
+
+def get_color_marker(index):
+    value = index + 1
+    components = [(value >> shift)&255 for shift in (16, 8, 0)]
+    return "\\special{color push rgb %s}"%" ".join([
+        "%.6f"%((component + 0.25)/255.0)
+        for component in components
+    ])
+
+def get_color_marker_index(fill):
+    #Inverse of get_color_marker, None for colors it doesn't make
+    if fill is None or not fill.startswith("#"):
+        return None
+    hex_string = fill[1:]
+    if len(hex_string) == 3:
+        hex_string = "".join([char*2 for char in hex_string])
+    try:
+        value = int(hex_string, 16)
+    except ValueError:
+        return None
+    if value == 0:
+        return None
+    return value - 1
+
+#TeX cache
+#
+#Every file made for an expression is named by tex_hash, a digest of
+#the expression and the contents of its template.  Files are written
+#under temporary names and renamed once complete, so that processes
+#sharing TEX_DIR never see half written ones.  Keys of expressions whose
+#svgs are done get appended to TEX_CACHE_INDEX_FILE.  It's read in
+#once per process, then only what other processes have appended since
+#gets read, and only after a miss.  Hits are still checked against the
+#file system, since svgs may have been deleted by hand, or the index
+#may come from another checkout.  See prune_tex_cache.py for keeping
+#the size of TEX_DIR bounded.
+
+TEX_CACHE_INDEX_FILE = os.path.join(TEX_DIR, "cache_index.txt")
+TEX_CACHE_KEYS = set()
+#How much of the index has been read, and when it was last modified
+TEX_CACHE_INDEX_STATE = {
+    "size" : 0,
+    "mtime" : None,
+}
+
+#Digests of template files, by path, modification time and size
+TEMPLATE_DIGESTS = {}
+
+def get_template_digest(template_tex_file):
+    stat = os.stat(template_tex_file)
+    key = (template_tex_file, stat.st_mtime, stat.st_size)
+    if key not in TEMPLATE_DIGESTS:
+        with open(template_tex_file, "r") as infile:
+            TEMPLATE_DIGESTS[key] = hashlib.sha256(infile.read()).hexdigest()
+    return TEMPLATE_DIGESTS[key]
+
 def tex_hash(expression, template_tex_file):
-    return str(hash(expression + template_tex_file))
+    if isinstance(expression, unicode):
+        expression = expression.encode("utf-8")
+    hasher = hashlib.sha256()
+    hasher.update(get_template_digest(template_tex_file))
+    hasher.update(expression)
+    return hasher.hexdigest()
+
+def get_tex_cache_file(key, extension):
+    return os.path.join(TEX_DIR, key + extension)
+
+def get_temp_tex_cache_file(key, extension):
+    return os.path.join(TEX_DIR, "%s_%dTemp%s"%(key, os.getpid(), extension))
+
+def is_tex_cached(key):
+    if key not in TEX_CACHE_KEYS:
+        #Other processes may have added it since the index was last read
+        load_tex_cache_index()
+    svg_exists = os.path.exists(get_tex_cache_file(key, ".svg"))
+    if key in TEX_CACHE_KEYS:
+        if not svg_exists:
+            TEX_CACHE_KEYS.discard(key)
+        return svg_exists
+    if svg_exists:
+        add_to_tex_cache_index(key)
+    return svg_exists
+
+def load_tex_cache_index():
+    """
+    Reads whatever has been appended to the index since it was last
+    read, or all of it if it's been rewritten (e.g. by a prune)
+    """
+    if not os.path.exists(TEX_CACHE_INDEX_FILE):
+        return
+    stat = os.stat(TEX_CACHE_INDEX_FILE)
+    state = TEX_CACHE_INDEX_STATE
+    if stat.st_mtime == state["mtime"] and stat.st_size == state["size"]:
+        return
+    if stat.st_size < state["size"]:
+        TEX_CACHE_KEYS.clear()
+        state["size"] = 0
+    with open(TEX_CACHE_INDEX_FILE, "r") as index_file:
+        index_file.seek(state["size"])
+        text = index_file.read()
+    #Leave any line still being written for next time
+    text = text[:text.rfind("\n")+1]
+    TEX_CACHE_KEYS.update(text.split())
+    state["size"] += len(text)
+    state["mtime"] = stat.st_mtime
+
+def add_to_tex_cache_index(key):
+    TEX_CACHE_KEYS.add(key)
+    #Appends this short are atomic, so
+    #concurrent processes can't garble lines
+    with open(TEX_CACHE_INDEX_FILE, "a") as index_file:
+        index_file.write(key + "\n")
 
 def tex_to_svg_file(expression, template_tex_file):
-    image_dir = os.path.join(
-        TEX_IMAGE_DIR,
-        tex_hash(expression, template_tex_file)
-    )
+    key = tex_hash(expression, template_tex_file)
+    if TEX_RECORDING["expressions"] is not None:
+        record_tex_expression(expression, template_tex_file)
+        if TEX_RECORDING["stub"] and not is_tex_cached(key):
+            return get_placeholder_svg_file(expression)
+    image_dir = os.path.join(TEX_IMAGE_DIR, key)
     if os.path.exists(image_dir):
         return get_sorted_image_list(image_dir)
+    if is_tex_cached(key):
+        return get_tex_cache_file(key, ".svg")
+    if expression in PENDING_TEX_EXPRESSIONS.get(template_tex_file, []):
+        compile_pending_tex_expressions(template_tex_file)
+        if is_tex_cached(key):
+            return get_tex_cache_file(key, ".svg")
     tex_file = generate_tex_file(expression, template_tex_file)
     dvi_file = tex_to_dvi(tex_file)
-    return dvi_to_svg(dvi_file)
+    result = dvi_to_svg(dvi_file)
+    add_to_tex_cache_index(key)
+    return result
 
 def generate_tex_file(expression, template_tex_file):
-    result = os.path.join(
-        TEX_DIR,
-        tex_hash(expression, template_tex_file)
-    ) + ".tex"
+    key = tex_hash(expression, template_tex_file)
+    result = get_tex_cache_file(key, ".tex")
     if not os.path.exists(result):
         print("Writing \"%s\" to %s"%(
             "".join(expression), result
@@ -343,8 +606,10 @@ def generate_tex_file(expression, template_tex_file):
         with open(template_tex_file, "r") as infile:
             body = infile.read()
             body = body.replace(TEX_TEXT_TO_REPLACE, expression)
-        with open(result, "w") as outfile:
+        temp_file = get_temp_tex_cache_file(key, ".tex")
+        with open(temp_file, "w") as outfile:
             outfile.write(body)
+        os.rename(temp_file, result)
     return result
 
 def get_null():
@@ -352,30 +617,159 @@ def get_null():
         return "NUL"
     return "/dev/null"
 
+def run_latex(tex_file, job_name, format_file = None):
+    """
+    Typesets tex_file into TEX_DIR/<job_name>.dvi, raising
+    an exception pointing at the log if latex fails
+    """
+    commands = [
+        "latex",
+        "-interaction=batchmode",
+        "-halt-on-error",
+        "-output-directory=" + TEX_DIR,
+        "-jobname=" + job_name,
+    ]
+    if format_file is not None:
+        commands.append("-fmt=" + format_file)
+    commands += [
+        tex_file,
+        ">",
+        get_null()
+    ]
+    exit_code = os.system(" ".join(commands))
+    if exit_code != 0:
+        log_file = os.path.join(TEX_DIR, job_name + ".log")
+        raise Exception(
+            "Latex error converting to dvi. "
+            "See log output above or the log file: %s" % log_file)
+    return os.path.join(TEX_DIR, job_name + ".dvi")
+
+def remove_latex_byproducts(job_name):
+    for extension in ".aux", ".log":
+        path = os.path.join(TEX_DIR, job_name + extension)
+        if os.path.exists(path):
+            os.remove(path)
+
+def run_dvisvgm(dvi_file, output_pattern, *extra_args):
+    commands = [
+        "dvisvgm",
+        dvi_file,
+    ] + list(extra_args) + [
+        "-n",
+        "-v",
+        "0",
+        "-o",
+        output_pattern,
+        ">",
+        get_null()
+    ]
+    exit_code = os.system(" ".join(commands))
+    if exit_code != 0:
+        raise Exception("dvisvgm failed to convert %s"%dvi_file)
+
 def tex_to_dvi(tex_file):
     result = tex_file.replace(".tex", ".dvi")
     if not os.path.exists(result):
-        commands = [
-            "latex",
-            "-interaction=batchmode",
-            "-halt-on-error",
-            "-output-directory=" + TEX_DIR,
-            tex_file,
-            ">",
-            get_null()
-        ]
-        exit_code = os.system(" ".join(commands))
-        if exit_code != 0:
-            latex_output = ''
-            log_file = tex_file.replace(".tex", ".log")
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    latex_output = f.read()
-            raise Exception(
-                "Latex error converting to dvi. "
-                "See log output above or the log file: %s" % log_file)
+        key = os.path.basename(tex_file).replace(".tex", "")
+        #Output goes under a job name specific to this process,
+        #and gets renamed once latex is done with it
+        job_name = os.path.basename(
+            get_temp_tex_cache_file(key, "")
+        )
+        with open(tex_file, "r") as infile:
+            document = infile.read()
+        temp_dvi_file = typeset_tex_document(document, job_name)
+        os.rename(temp_dvi_file, result)
+        remove_latex_byproducts(job_name)
+    return result
+
+#Formats
+#
+#Most of the time spent typesetting a short expression goes to loading
+#the packages in its template's preamble.  So each preamble is loaded
+#once, by latex -ini, and dumped into a format file which later runs
+#start from, leaving them only the body of the document to read.  If
+#a format can't be built, or typesetting with it fails, the whole
+#document gets typeset as usual.
+
+USE_TEX_FORMATS = True
+#Digests of preambles whose formats failed to build in this process
+FAILED_TEX_FORMATS = set()
+
+def split_tex_document(document):
+    """
+    Returns the preamble of document, and the rest starting
+    with \\begin{document}
+    """
+    index = document.index("\\begin{document}")
+    return document[:index], document[index:]
+
+def get_format_file(preamble):
+    """
+    Returns the path of a format with preamble loaded, building
+    it if need be, or None if that fails
+    """
+    digest = hashlib.sha256(preamble).hexdigest()
+    result = os.path.join(TEX_DIR, "format_%s.fmt"%digest)
+    if os.path.exists(result):
+        return result
+    if digest in FAILED_TEX_FORMATS:
+        return None
+    job_name = "format_%s_%dTemp"%(digest, os.getpid())
+    ini_file = os.path.join(TEX_DIR, job_name + ".tex")
+    with open(ini_file, "w") as outfile:
+        outfile.write(preamble + "\n\\dump\n")
+    commands = [
+        "latex",
+        "-ini",
+        "-interaction=batchmode",
+        "-halt-on-error",
+        "-output-directory=" + TEX_DIR,
+        "-jobname=" + job_name,
+        "\"&latex\"",
+        ini_file,
+        ">",
+        get_null()
+    ]
+    exit_code = os.system(" ".join(commands))
+    temp_format_file = os.path.join(TEX_DIR, job_name + ".fmt")
+    if exit_code == 0 and os.path.exists(temp_format_file):
+        os.rename(temp_format_file, result)
+    else:
+        print("Couldn't build a format for this preamble, typesetting "
+              "with the full template instead.  See %s"%(
+                  os.path.join(TEX_DIR, job_name + ".log")
+              ))
+        FAILED_TEX_FORMATS.add(digest)
+        result = None
+    os.remove(ini_file)
     return result
 
+def typeset_tex_document(document, job_name):
+    """
+    Typesets document into TEX_DIR/<job_name>.dvi, starting
+    from a format for its preamble where possible
+    """
+    tex_file = os.path.join(TEX_DIR, job_name + ".tex")
+    preamble, body = split_tex_document(document)
+    format_file = get_format_file(preamble) if USE_TEX_FORMATS else None
+    if format_file is not None:
+        with open(tex_file, "w") as outfile:
+            outfile.write(body)
+        try:
+            return run_latex(tex_file, job_name, format_file)
+        except Exception:
+            print("Typesetting %s from its format failed, "
+                  "trying the full document"%job_name)
+        finally:
+            os.remove(tex_file)
+    with open(tex_file, "w") as outfile:
+        outfile.write(document)
+    try:
+        return run_latex(tex_file, job_name)
+    finally:
+        os.remove(tex_file)
+
 def dvi_to_svg(dvi_file, regen_if_exists = False):
     """
     Converts a dvi, which potentially has multiple slides, into a
@@ -385,16 +779,295 @@ def dvi_to_svg(dvi_file, regen_if_exists = False):
     """
     result = dvi_file.replace(".dvi", ".svg")
     if not os.path.exists(result):
-        commands = [
-            "dvisvgm",
-            dvi_file,
-            "-n",
-            "-v",
-            "0",
-            "-o",
-            result,
-            ">",
-            get_null()
+        key = os.path.basename(dvi_file).replace(".dvi", "")
+        temp_file = get_temp_tex_cache_file(key, ".svg")
+        run_dvisvgm(dvi_file, temp_file)
+        if not os.path.exists(temp_file):
+            raise Exception("dvisvgm failed to convert %s"%dvi_file)
+        os.rename(temp_file, result)
+    return result
+
+#Batches
+#
+#Starting latex costs far more than typesetting a short expression,
+#so expressions known to be needed ahead of time get queued here, and
+#the first request for any of them typesets every expression queued
+#for its template as the pages of one document.
+#
+#A TexMobject needs its svg as soon as it's made, so batches never span
+#more than one of them (and only hold anything for the fallback path of
+#handle_multiple_args).  Batching the expressions of a whole scene
+#takes knowing them in advance, which is what --prefetch_tex in
+#extract_scene.py does, or scenes can call tex_to_svg_files themselves.
+
+#Uncached expressions waiting to be typeset, by template
+PENDING_TEX_EXPRESSIONS = collections.OrderedDict()
+MAX_TEX_BATCH_SIZE = 200
+TEX_BATCH_COUNTER = it.count()
+
+def queue_tex_expression(expression, template_tex_file):
+    if TEX_RECORDING["stub"]:
+        return
+    if is_tex_cached(tex_hash(expression, template_tex_file)):
+        return
+    pending = PENDING_TEX_EXPRESSIONS.setdefault(template_tex_file, [])
+    if expression not in pending:
+        pending.append(expression)
+
+def compile_pending_tex_expressions(template_tex_file = None):
+    if template_tex_file is None:
+        template_tex_files = list(PENDING_TEX_EXPRESSIONS.keys())
+    else:
+        template_tex_files = [template_tex_file]
+    for template_tex_file in template_tex_files:
+        expressions = PENDING_TEX_EXPRESSIONS.pop(template_tex_file, [])
+        for index in range(0, len(expressions), MAX_TEX_BATCH_SIZE):
+            compile_tex_batch(
+                expressions[index:index+MAX_TEX_BATCH_SIZE],
+                template_tex_file
+            )
+
+def tex_to_svg_files(expressions, template_tex_file):
+    for expression in expressions:
+        queue_tex_expression(expression, template_tex_file)
+    compile_pending_tex_expressions(template_tex_file)
+    return [
+        tex_to_svg_file(expression, template_tex_file)
+        for expression in expressions
+    ]
+
+def compile_tex_batch(expressions, template_tex_file):
+    """
+    Typesets all uncached expressions with one run each of latex
+    and dvisvgm.  If that fails, say because one of the expressions
+    has an error, they're typeset one at a time instead, so that
+    errors get reported against the right expression.
+    """
+    keys_to_expressions = collections.OrderedDict()
+    for expression in expressions:
+        key = tex_hash(expression, template_tex_file)
+        if not is_tex_cached(key):
+            keys_to_expressions[key] = expression
+    if len(keys_to_expressions) > 1:
+        try:
+            typeset_tex_batch(keys_to_expressions, template_tex_file)
+        except Exception as error:
+            print("Typesetting %d expressions together failed (%s), "
+                  "trying them one at a time"%(len(keys_to_expressions), error))
+    for key, expression in keys_to_expressions.items():
+        if not is_tex_cached(key):
+            tex_to_svg_file(expression, template_tex_file)
+
+def get_batch_tex_body(expressions, template_tex_file):
+    """
+    Turns the template into a document with a page for each
+    expression, using standalone's multi option
+    """
+    with open(template_tex_file, "r") as infile:
+        template = infile.read()
+    if "{standalone}" not in template or "\\documentclass[" not in template:
+        raise Exception(
+            "Can only batch templates of the form "
+            "\\documentclass[...]{standalone}"
+        )
+    preamble, rest = template.split("\\begin{document}", 1)
+    body, end = rest.split("\\end{document}", 1)
+    preamble = preamble.replace(
+        "\\documentclass[", "\\documentclass[multi,", 1
+    )
+    pages = [
+        "\\begin{standalone}%s\\end{standalone}\n"%body.replace(
+            TEX_TEXT_TO_REPLACE, expression
+        )
+        for expression in expressions
+    ]
+    return "".join([
+        preamble, "\\begin{document}\n",
+    ] + pages + [
+        "\\end{document}\n",
+    ])
+
+def typeset_tex_batch(keys_to_expressions, template_tex_file):
+    print("Typesetting %d expressions together"%len(keys_to_expressions))
+    job_name = "batch_%d_%dTemp"%(os.getpid(), TEX_BATCH_COUNTER.next())
+    try:
+        dvi_file = typeset_tex_document(get_batch_tex_body(
+            keys_to_expressions.values(), template_tex_file
+        ), job_name)
+        run_dvisvgm(
+            dvi_file, os.path.join(TEX_DIR, job_name + "_%p.svg"),
+            "--page=1-"
+        )
+        page_files = get_batch_page_files(job_name)
+        if len(page_files) != len(keys_to_expressions):
+            raise Exception("expected %d pages, got %d"%(
+                len(keys_to_expressions), len(page_files)
+            ))
+        for key, page_file in zip(keys_to_expressions.keys(), page_files):
+            os.rename(page_file, get_tex_cache_file(key, ".svg"))
+            add_to_tex_cache_index(key)
+    finally:
+        for page_file in get_batch_page_files(job_name):
+            os.remove(page_file)
+        for extension in ".tex", ".dvi", ".aux", ".log":
+            path = os.path.join(TEX_DIR, job_name + extension)
+            if os.path.exists(path):
+                os.remove(path)
+
+def get_batch_page_files(job_name):
+    #dvisvgm may zero pad page numbers, so sort by their values
+    prefix = job_name + "_"
+    page_numbers_and_files = []
+    for name in os.listdir(TEX_DIR):
+        page = name[len(prefix):-len(".svg")]
+        if name.startswith(prefix) and name.endswith(".svg") and page.isdigit():
+            page_numbers_and_files.append(
+                (int(page), os.path.join(TEX_DIR, name))
+            )
+    return [path for page, path in sorted(page_numbers_and_files)]
+
+#Prefetching
+#
+#Recording notes every expression requested from tex_to_svg_file, so
+#that a dry run of a scene (with stub set, which hands back placeholder
+#svgs instead of running latex) can discover what it needs, and have
+#prefetch_tex_expressions typeset it all in parallel before the real
+#render.
+
+TEX_RECORDING = {
+    "expressions" : None,
+    "stub" : False,
+}
+
+def start_recording_tex_expressions(stub = False):
+    TEX_RECORDING["expressions"] = collections.OrderedDict()
+    TEX_RECORDING["stub"] = stub
+
+def stop_recording_tex_expressions():
+    """
+    Returns a list of the (expression, template_tex_file) pairs
+    requested since recording started
+    """
+    result = TEX_RECORDING["expressions"].keys()
+    TEX_RECORDING["expressions"] = None
+    TEX_RECORDING["stub"] = False
+    return result
+
+def record_tex_expression(expression, template_tex_file):
+    TEX_RECORDING["expressions"][(expression, template_tex_file)] = True
+
+def get_placeholder_svg_file(expression):
+    """
+    Stand-in svg with a box for each non-whitespace character
+    of the expression, so that code picking out glyphs by index
+    stands some chance of running
+    """
+    num_glyphs = max(len("".join(expression.split())), 1)
+    result = os.path.join(TEX_DIR, "placeholder_%d.svg"%num_glyphs)
+    if not os.path.exists(result):
+        paths = [
+            "<path d='M %d 0 L %d 0 L %d 10 L %d 10 Z'/>"%(
+                10*count, 10*count+8, 10*count+8, 10*count
+            )
+            for count in range(num_glyphs)
         ]
-        os.system(" ".join(commands))
+        temp_file = "%s_%dTemp"%(result, os.getpid())
+        with open(temp_file, "w") as outfile:
+            #Filled with the marker of the first arg, so that
+            #multi-arg expressions don't go on to typeset each arg
+            outfile.write("<svg fill='#000001'>%s</svg>"%"".join(paths))
+        os.rename(temp_file, result)
     return result
+
+def compile_tex_batch_from_args(args):
+    #Pool.map hands over a single argument
+    compile_tex_batch(*args)
+
+def prefetch_tex_expressions(expressions_and_templates, num_processes = 1):
+    """
+    Typesets all uncached (expression, template_tex_file) pairs,
+    split into batches across num_processes processes
+    """
+    expressions_by_template = collections.OrderedDict()
+    for expression, template_tex_file in expressions_and_templates:
+        if is_tex_cached(tex_hash(expression, template_tex_file)):
+            continue
+        expressions = expressions_by_template.setdefault(template_tex_file, [])
+        if expression not in expressions:
+            expressions.append(expression)
+    batches = []
+    for template_tex_file, expressions in expressions_by_template.items():
+        batch_size = min(
+            int(np.ceil(float(len(expressions))/num_processes)),
+            MAX_TEX_BATCH_SIZE
+        )
+        batches += [
+            (expressions[index:index+batch_size], template_tex_file)
+            for index in range(0, len(expressions), batch_size)
+        ]
+    if num_processes > 1 and len(batches) > 1:
+        #Imported here, since only prefetching needs it
+        import multiprocessing as mp
+        pool = mp.Pool(min(num_processes, len(batches)))
+        try:
+            pool.map(compile_tex_batch_from_args, batches)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for batch in batches:
+            compile_tex_batch_from_args(batch)
+    return sum([len(expressions) for expressions, template in batches])
+
+def get_tex_cache_entries():
+    """
+    Returns a list of (last_modified, size_in_bytes, key, paths)
+    for every expression with files in TEX_DIR, skipping any
+    still being written.
+    """
+    paths_by_key = collections.defaultdict(list)
+    for name in os.listdir(TEX_DIR):
+        key, extension = os.path.splitext(name)
+        if len(key) != 64 or "Temp" in name:
+            continue
+        paths_by_key[key].append(os.path.join(TEX_DIR, name))
+    entries = []
+    for key, paths in paths_by_key.items():
+        stats = [os.stat(path) for path in paths]
+        entries.append((
+            max([stat.st_mtime for stat in stats]),
+            sum([stat.st_size for stat in stats]),
+            key, paths
+        ))
+    return entries
+
+def prune_tex_cache(max_size_in_bytes):
+    """
+    Removes the files of the least recently made expressions until
+    those left in TEX_DIR total at most max_size_in_bytes, then
+    rewrites the index.  Don't run this while scenes are rendering.
+    Returns the number of expressions removed.
+    """
+    entries = sorted(get_tex_cache_entries())
+    total_size = sum([size for mtime, size, key, paths in entries])
+    num_removed = 0
+    for mtime, size, key, paths in entries:
+        if total_size <= max_size_in_bytes:
+            break
+        for path in paths:
+            os.remove(path)
+        total_size -= size
+        num_removed += 1
+    remaining_keys = [
+        key
+        for mtime, size, key, paths in entries[num_removed:]
+        if os.path.exists(get_tex_cache_file(key, ".svg"))
+    ]
+    temp_index_file = "%s_%dTemp"%(TEX_CACHE_INDEX_FILE, os.getpid())
+    with open(temp_index_file, "w") as index_file:
+        index_file.write("".join([key + "\n" for key in remaining_keys]))
+    os.rename(temp_index_file, TEX_CACHE_INDEX_FILE)
+    TEX_CACHE_KEYS.clear()
+    TEX_CACHE_INDEX_STATE["size"] = 0
+    TEX_CACHE_INDEX_STATE["mtime"] = None
+    return num_removed
@@ -169,8 +169,11 @@ class VMobject(Mobject):
     ## Drawing
     def start_at(self, point):
         if len(self.points) == 0:
-            self.points = np.zeros((1, 3))
-        self.points[0] = point
+            points = np.zeros((1, 3))
+        else:
+            points = np.array(self.points)
+        points[0] = point
+        self.points = points
         return self
 
     def add_control_points(self, control_points):
@@ -189,11 +192,12 @@ class VMobject(Mobject):
         assert(len(anchors) == len(handles1)+1)
         assert(len(anchors) == len(handles2)+1)
         total_len = 3*(len(anchors)-1) + 1
-        self.points = np.zeros((total_len, self.dim))
-        self.points[0] = anchors[0]
+        points = np.zeros((total_len, self.dim))
+        points[0] = anchors[0]
         arrays = [handles1, handles2, anchors[1:]]
         for index, array in enumerate(arrays):
-            self.points[index+1::3] = array
+            points[index+1::3] = array
+        self.points = points
         return self.points
 
     def set_points_as_corners(self, points):
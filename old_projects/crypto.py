@@ -3111,9 +3111,11 @@ class IntroduceBlockChain(Scene):
                 0
             ])
             arrow = Arrow(end+LEFT, end, buff = SMALL_BUFF)
-            arrow.points[0] = block.get_right()
-            arrow.points[1] = block.get_right() + RIGHT
-            arrow.points[2] = end + LEFT + SMALL_BUFF*UP
+            points = np.array(arrow.points)
+            points[0] = block.get_right()
+            points[1] = block.get_right() + RIGHT
+            points[2] = end + LEFT + SMALL_BUFF*UP
+            arrow.points = points
             new_arrows.add(arrow)
 
         for i in range(3):
@@ -3304,10 +3306,12 @@ class DistributedBlockChainScene(DistributedLedgerScene):
                 b2.get_left(), b2.get_corner(UP+LEFT), 0.8
             )
             arrow.next_to(target_point, LEFT, 0.5*SMALL_BUFF)
-            arrow.points[0] = b1.get_right()
-            arrow.points[1] = b2.get_left()
-            arrow.points[2] = b1.get_corner(UP+RIGHT)
-            arrow.points[2] += SMALL_BUFF*LEFT
+            points = np.array(arrow.points)
+            points[0] = b1.get_right()
+            points[1] = b2.get_left()
+            points[2] = b1.get_corner(UP+RIGHT)
+            points[2] += SMALL_BUFF*LEFT
+            arrow.points = points
             arrows.add(arrow)
         block_chain = VGroup(blocks, arrows)
         block_chain.blocks = blocks
@@ -4294,9 +4298,13 @@ class AliceRacesOtherMiners(DoubleSpendingAttack):
         block.target.shift(dist*DOWN)
         ff_head.target.shift(dist*UP)
         arrow.target[1].shift(dist*DOWN)
-        arrow.target.points[-2:] += dist*DOWN
+        points = np.array(arrow.target.points)
+        points[-2:] += dist*DOWN
+        arrow.target.points = points
         ff_arrow.target[1].shift(dist*UP)
-        ff_arrow.target.points[-2:] += dist*UP
+        points = np.array(ff_arrow.target.points)
+        points[-2:] += dist*UP
+        ff_arrow.target.points = points
 
         self.play(
             Broadcast(block),
@@ -231,7 +231,9 @@ class ShowMatrixTransform(TransformScene2D):
         if show_matrix:
             self.add(matrix_mobject(matrix).to_corner(UP+LEFT))
         def func(mobject):
-            mobject.points[:, :2] = np.dot(mobject.points[:, :2], np.transpose(matrix))
+            points = np.array(mobject.points)
+            points[:, :2] = np.dot(points[:, :2], np.transpose(matrix))
+            mobject.points = points
             return mobject
 
         self.wait()
@@ -463,7 +465,9 @@ class ShowMatrixTransformWithDot(TransformScene2D):
         if show_matrix:
             self.add(matrix_mobject(matrix).to_corner(UP+LEFT))
         def func(mobject):
-            mobject.points[:, :2] = np.dot(mobject.points[:, :2], np.transpose(matrix))
+            points = np.array(mobject.points)
+            points[:, :2] = np.dot(points[:, :2], np.transpose(matrix))
+            mobject.points = points
             return mobject
         dot = Dot((-1, 2, 0), color = "yellow")
         self.add(dot)
@@ -349,7 +349,9 @@ def make_transparent(image_mob):
         dtype = 'uint8'
     )
     image_mob.highlight(WHITE)
-    image_mob.pixel_array[:,:,3] = alpha_vect
+    pixel_array = np.array(image_mob.pixel_array)
+    pixel_array[:,:,3] = alpha_vect
+    image_mob.pixel_array = pixel_array
     return image_mob
 
 ###############################
@@ -1575,7 +1577,9 @@ class BreakUpMacroPatterns(IntroduceEachLayer):
             mob.highlight(color)
             mob.save_state()
             mob.move_to(nine)
-        right_line[1].pixel_array[:14,:,3] = 0
+        pixel_array = np.array(right_line[1].pixel_array)
+        pixel_array[:14,:,3] = 0
+        right_line[1].pixel_array = pixel_array
 
         self.play(FadeIn(nine))
         self.wait()
@@ -1756,7 +1760,9 @@ class BreakUpMacroPatterns(IntroduceEachLayer):
             dtype = 'uint8'
         )
         image_mob.highlight(WHITE)
-        image_mob.pixel_array[:,:,3] = alpha_vect
+        pixel_array = np.array(image_mob.pixel_array)
+        pixel_array[:,:,3] = alpha_vect
+        image_mob.pixel_array = pixel_array
         return image_mob
 
 class GenerallyLoopyPattern(Scene):
@@ -1947,13 +1953,14 @@ class SecondLayerIsLittleEdgeLayer(IntroduceEachLayer):
         for i, j in it.product(range(n), range(k)):
             mob = ImageMobject(np.zeros((28, 28, 4), dtype = 'uint8'))
             mob.replace(self.nine[1])
-            pa = mob.pixel_array
+            pa = np.array(mob.pixel_array)
             color = colors[(k*i + j)%(len(colors))]
             rgb = (255*color_to_rgb(color)).astype('uint8')
             pa[:,:,:3] = rgb
             i0, i1 = 1+(28/n)*i, 1+(28/n)*(i+1)
             j0, j1 = (28/k)*j, (28/k)*(j+1)
             pa[i0:i1,j0:j1,3] = nine_pa[i0:i1,j0:j1,3]
+            mob.pixel_array = pa
             self.edge_colored_nine.add(mob)
         self.edge_colored_nine.next_to(layers[1], UP)
 
@@ -1965,7 +1972,9 @@ class SecondLayerIsLittleEdgeLayer(IntroduceEachLayer):
             make_transparent(mob)
             mob.highlight(color)
             mob.replace(self.nine[1])
-        line.pixel_array[:14,:,:] = 0
+        pixel_array = np.array(line.pixel_array)
+        pixel_array[:14,:,:] = 0
+        line.pixel_array = pixel_array
 
         self.pattern_colored_nine = Group(loop, line)
         self.pattern_colored_nine.next_to(layers[2], UP)
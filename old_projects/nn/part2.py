@@ -3668,8 +3668,10 @@ class CompareLearningCurves(GraphScene):
             lambda x : 4.3*sigmoid(5*(2-x)) + 3 + 0.5*ReLU(3-x)
         )
         for decrease, p in (slow_decrease, 0.2), (faster_decrease, 0.07):
-            y_vals = decrease.get_anchors()[:,1]
+            points = np.array(decrease.points)
+            y_vals = points[::3,1]
             y_vals -= np.cumsum(p*np.random.random(len(y_vals)))
+            decrease.points = points
             decrease.make_jagged()
         faster_decrease.move_to(slow_decrease, UP+LEFT)
 
@@ -34,7 +34,9 @@ class NumberLineScene(Scene):
         squished_new_line = new_number_line.copy()
         squished_new_line.scale(1.0/zoom_factor)
         squished_new_line.shift(self.number_line.number_to_point(number))
-        squished_new_line.points[:,1] = self.number_line.number_to_point(0)[1]
+        points = np.array(squished_new_line.points)
+        points[:,1] = self.number_line.number_to_point(0)[1]
+        squished_new_line.points = points
         transforms.append(Transform(squished_new_line, new_number_line))
         for mob, num in zip(new_number_mobs, new_displayed_numbers):
             point = Point(self.number_line.number_to_point(num))
@@ -1014,8 +1014,10 @@ class DeformToInterval(ClosedLoopScene):
         self.loop.to_edge(UP)
         original_loop = self.loop.copy()
         cut_loop = self.loop.copy()
-        cut_loop.points[0] += 0.3*(UP+RIGHT)
-        cut_loop.points[-1] += 0.3*(DOWN+RIGHT)
+        points = np.array(cut_loop.points)
+        points[0] += 0.3*(UP+RIGHT)
+        points[-1] += 0.3*(DOWN+RIGHT)
+        cut_loop.points = points
 
         #Unwrap loop
         self.transform_loop(cut_loop, path_arc = np.pi)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python2
+"""
+Evicts the least recently compiled expressions from the TeX cache
+(TEX_DIR) until it fits within the given size.  Don't run this while
+scenes are rendering.
+
+   python prune_tex_cache.py MAX_SIZE_IN_MEGABYTES
+"""
+import argparse
+
+from helpers import *
+from mobject.tex_mobject import prune_tex_cache
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("max_size_in_megabytes", type = float)
+    args = parser.parse_args()
+    num_removed = prune_tex_cache(int(args.max_size_in_megabytes*2**20))
+    print("Removed %d expressions from %s"%(num_removed, TEX_DIR))
+
+if __name__ == "__main__":
+    main()
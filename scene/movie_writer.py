@@ -0,0 +1,82 @@
+import numpy as np
+import threading
+import Queue
+import os
+import subprocess as sp
+
+from helpers import *
+
+class FrameWriter(threading.Thread):
+    """
+    Feeds frames into the stdin of a movie writing process (i.e. ffmpeg)
+    from a background thread, so that encoding one frame can overlap
+    with rasterizing the next.
+
+    At most max_queued_frames frames are held in the queue, after which
+    write_frame blocks until the writing process has caught up.  Frames
+    are handed over without copying, so they must not be modified in
+    place once written.
+    """
+    def __init__(self, writing_process, max_queued_frames = 16):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.writing_process = writing_process
+        self.queue = Queue.Queue(maxsize = max_queued_frames)
+        self.error = None
+        self.start()
+
+    def run(self):
+        stream = self.writing_process.stdin
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                return
+            if self.error is not None:
+                #Keep draining, so that producers never block
+                #on a writer which has already failed
+                continue
+            try:
+                stream.write(memoryview(frame))
+            except Exception as error:
+                self.error = error
+
+    def raise_error_if_present(self):
+        if self.error is not None:
+            raise IOError(
+                "Writing frames to the movie pipe failed: %s"%str(self.error)
+            )
+
+    def write_frame(self, frame):
+        self.raise_error_if_present()
+        self.queue.put(np.ascontiguousarray(frame))
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+        self.raise_error_if_present()
+
+def concatenate_movie_files(file_paths, output_file_path):
+    """
+    Losslessly joins movies which were encoded with the same
+    settings, using ffmpeg's concat demuxer.
+    """
+    list_file_path = output_file_path + ".concat.txt"
+    with open(list_file_path, "w") as list_file:
+        for file_path in file_paths:
+            escaped_path = os.path.abspath(file_path).replace("'", "'\\''")
+            list_file.write("file '%s'\n"%escaped_path)
+    command = [
+        FFMPEG_BIN,
+        '-y', # overwrite output file if it exists
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_file_path,
+        '-c', 'copy',
+        '-loglevel', 'error',
+        output_file_path,
+    ]
+    exit_code = sp.call(command)
+    os.remove(list_file_path)
+    if exit_code != 0:
+        raise Exception("ffmpeg failed to concatenate %s"%", ".join(file_paths))
+    return output_file_path
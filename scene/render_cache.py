@@ -0,0 +1,186 @@
+import numpy as np
+import hashlib
+import os
+import time
+import types
+from colour import Color
+
+from helpers import *
+from camera import Camera
+
+class RenderCache(object):
+    """
+    Directory of partial movies, each named by the hash of everything
+    that went into rendering it (see get_render_hash).  Whenever a
+    partial movie is reused its modification time gets bumped, so
+    that prune can evict the least recently used ones first once the
+    directory grows past max_size_in_bytes.  Partial movies left half
+    written by renders which got killed are removed once they're more
+    than max_temp_file_age (in seconds) old.
+    """
+    def __init__(self, directory, max_size_in_bytes, max_temp_file_age = 3600):
+        self.directory = directory
+        self.max_size_in_bytes = max_size_in_bytes
+        self.max_temp_file_age = max_temp_file_age
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def get_file_path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def get_temp_file_path(self, key, extension):
+        return os.path.join(
+            self.directory, "%s_%dTemp%s"%(key, os.getpid(), extension)
+        )
+
+    def contains(self, file_path):
+        if not os.path.exists(file_path):
+            return False
+        os.utime(file_path, None)
+        return True
+
+    def add(self, temp_file_path, file_path):
+        os.rename(temp_file_path, file_path)
+
+    def prune(self):
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            if "Temp" in name:
+                #Partial movies still being written are left alone,
+                #those abandoned by killed renders are not
+                if now - stat.st_mtime > self.max_temp_file_age:
+                    os.remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum([size for mtime, size, path in entries])
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size_in_bytes:
+                break
+            os.remove(path)
+            total_size -= size
+
+def get_render_hash(*objects):
+    hasher = hashlib.sha256()
+    update_render_hash(hasher, objects, {})
+    return hasher.hexdigest()
+
+#Classes can't change over the course of a run, so their hashes
+#(which cover the code of every method) are only worked out once
+CLASS_HASHES = {}
+
+def get_class_hash(cls):
+    if cls in CLASS_HASHES:
+        return CLASS_HASHES[cls]
+    #Placeholder guards against classes referencing each other
+    CLASS_HASHES[cls] = cls.__module__ + "." + cls.__name__
+    hasher = hashlib.sha256()
+    memo = {}
+    for klass in getattr(cls, "__mro__", [cls]):
+        if klass is object:
+            continue
+        hasher.update(klass.__module__ + "." + klass.__name__)
+        items = [
+            (key, value)
+            for key, value in klass.__dict__.items()
+            if key not in ["__dict__", "__weakref__", "__doc__"]
+        ]
+        update_render_hash(hasher, dict(items), memo)
+    CLASS_HASHES[cls] = hasher.hexdigest()
+    return CLASS_HASHES[cls]
+
+def update_render_hash(hasher, obj, memo):
+    """
+    Feeds into hasher everything about obj which could change what
+    it renders to, recursing through containers and attributes.
+    Anything without a stable description falls back on its repr,
+    which at worst (when that includes an address) means a cache miss.
+    Attributes and globals starting with an underscore are treated as
+    caches and skipped.
+    """
+    if isinstance(obj, (type(None), bool, int, long, float, complex, str, unicode)):
+        hasher.update(type(obj).__name__ + repr(obj))
+        return
+    if id(obj) in memo:
+        hasher.update("ref%d"%memo[id(obj)][0])
+        return
+    #Holding onto obj keeps its id from being reused
+    memo[id(obj)] = (len(memo), obj)
+    hasher.update(type(obj).__name__)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            update_render_hash(hasher, list(obj.flatten()), memo)
+        else:
+            hasher.update(str(obj.dtype) + str(obj.shape))
+            hasher.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        hasher.update(repr(obj))
+    elif isinstance(obj, Color):
+        hasher.update(obj.hex_l)
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(str(len(obj)))
+        for item in obj:
+            update_render_hash(hasher, item, memo)
+    elif isinstance(obj, dict):
+        for key, value in sorted(obj.items(), key = lambda item : repr(item[0])):
+            update_render_hash(hasher, key, memo)
+            update_render_hash(hasher, value, memo)
+    elif isinstance(obj, (set, frozenset)):
+        hasher.update(str(sorted(map(repr, obj))))
+    elif isinstance(obj, types.ModuleType):
+        hasher.update(obj.__name__)
+    elif isinstance(obj, (type, types.ClassType)):
+        hasher.update(get_class_hash(obj))
+    elif isinstance(obj, types.FunctionType):
+        update_render_hash(hasher, obj.__module__, memo)
+        update_render_hash(hasher, obj.__code__, memo)
+        update_render_hash(hasher, obj.__defaults__, memo)
+        if obj.__closure__ is not None:
+            update_render_hash(hasher, [
+                cell.cell_contents for cell in obj.__closure__
+            ], memo)
+        referenced_globals = dict([
+            (name, obj.__globals__[name])
+            for name in obj.__code__.co_names
+            if name in obj.__globals__ and not name.startswith("_")
+        ])
+        update_render_hash(hasher, referenced_globals, memo)
+    elif isinstance(obj, (staticmethod, classmethod)):
+        update_render_hash(hasher, obj.__func__, memo)
+    elif isinstance(obj, property):
+        update_render_hash(hasher, [obj.fget, obj.fset, obj.fdel], memo)
+    elif isinstance(obj, types.MethodType):
+        update_render_hash(hasher, obj.__func__, memo)
+        update_render_hash(hasher, obj.__self__, memo)
+    elif isinstance(obj, types.CodeType):
+        hasher.update(obj.co_name + obj.co_code)
+        update_render_hash(hasher, obj.co_consts, memo)
+        update_render_hash(hasher, obj.co_names, memo)
+    elif is_scene_instance(obj):
+        #What a scene draws is hashed through its mobjects and
+        #animations, so references to it (e.g. from closures in
+        #construct) shouldn't tie the hash to every line of construct
+        hasher.update(obj.__class__.__name__)
+    elif hasattr(obj, "__dict__"):
+        #These are a camera's output, not its input
+        excluded_keys = [
+            "pixel_array", "background_colored_vmobject_displayer",
+            "render_stats",
+        ] if isinstance(obj, Camera) else []
+        hasher.update(get_class_hash(obj.__class__))
+        update_render_hash(hasher, dict([
+            (key, value)
+            for key, value in obj.__dict__.items()
+            if not key.startswith("_") and key not in excluded_keys
+        ]), memo)
+    else:
+        hasher.update(repr(obj))
+
+def is_scene_instance(obj):
+    #Imported here, since scene.py imports this module
+    from scene import Scene
+    return isinstance(obj, Scene)
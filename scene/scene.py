@@ -10,11 +10,14 @@ import copy
 from tqdm import tqdm as ProgressDisplay
 import inspect
 import subprocess as sp
+import multiprocessing as mp
 
 from helpers import *
 
-from camera import Camera
+from camera import Camera, union_pixel_boxes
 from tk_scene import TkSceneRoot
+from movie_writer import FrameWriter, concatenate_movie_files
+from render_cache import RenderCache, get_render_hash
 from mobject import Mobject, VMobject
 from animation import Animation
 from animation.transform import MoveToTarget
@@ -35,11 +38,31 @@ class Scene(Container):
         "pngs_mode"        : "RGBA",
         "output_directory" : ANIMATIONS_DIR,
         "movie_file_extension" : ".mp4",
+        #Number of frames which can wait to be encoded before
+        #rendering blocks on the movie writing process
+        "max_queued_frames" : 16,
+        #When greater than 1, frames of plays whose animations
+        #are all pure functions of alpha are rasterized across
+        #this many forked processes
+        "num_render_processes" : 1,
+        "frames_per_render_task" : 8,
+        #When rendering plays, only restore and redraw the part of
+        #each frame which moving mobjects cover now or did last frame
+        "use_dirty_rectangles" : True,
+        #When writing to a movie, keep a partial movie for each play
+        #and wait, named by the hash of everything that went into it,
+        #so that unchanged ones get reused on later runs
+        "use_render_cache" : False,
+        "render_cache_directory" : os.path.join(ANIMATIONS_DIR, "partial_movie_cache"),
+        "render_cache_size" : 2**30, #In bytes
         "name" : None,
         "always_continually_update" : False,
         "random_seed" : 0,
         "start_at_animation_number" : None,
         "end_at_animation_number" : None,
+        #Turned off for all but the last of the partial movies
+        #that a chunked render gets concatenated from
+        "add_final_frame" : True,
         "include_render_quality_in_name" : False, #TODO, nothing uses this right now
     }
     def __init__(self, **kwargs):
@@ -73,7 +96,8 @@ class Scene(Container):
         # Always tack on one last frame, so that scenes
         # with no play calls still display something
         self.skip_animations = False
-        self.wait(self.frame_duration)
+        if self.add_final_frame:
+            self.wait(self.frame_duration)
 
         if self.write_to_movie:
             self.close_movie_pipe()
@@ -142,6 +166,9 @@ class Scene(Container):
     def capture_mobjects_in_camera(self, mobjects, **kwargs):
         self.camera.capture_mobjects(mobjects, **kwargs)
 
+    def get_render_stats(self):
+        return self.camera.get_render_stats()
+
     def update_frame(
         self, 
         mobjects = None, 
@@ -164,6 +191,40 @@ class Scene(Container):
         kwargs["include_submobjects"] = include_submobjects
         self.capture_mobjects_in_camera(mobjects, **kwargs)
 
+    def should_use_dirty_rectangles(self):
+        scene_methods = [
+            "update_frame",
+            "set_camera_pixel_array",
+            "capture_mobjects_in_camera",
+            "get_frame",
+        ]
+        camera_capture = self.camera.__class__.capture_mobjects.im_func
+        return all([
+            self.use_dirty_rectangles,
+            not self.skip_animations,
+            self.camera.can_bound_pixel_regions(),
+            camera_capture is Camera.capture_mobjects.im_func,
+        ] + [
+            getattr(self.__class__, name).im_func is getattr(Scene, name).im_func
+            for name in scene_methods
+        ])
+
+    def update_dirty_region(self, moving_mobjects, static_image, last_box):
+        """
+        Same as update_frame(moving_mobjects, static_image), given that
+        the camera still holds the frame from the last call, which
+        returned last_box, or static_image itself if last_box is None.
+        Nothing outside of where the moving mobjects were and are now
+        could have changed, so only that region gets restored.
+        """
+        box = self.camera.get_pixel_bounding_box(moving_mobjects)
+        dirty_box = union_pixel_boxes(box, last_box)
+        if dirty_box is not None:
+            self.camera.set_pixel_region(static_image, dirty_box)
+        if box is not None:
+            self.capture_mobjects_in_camera(moving_mobjects)
+        return box
+
     def freeze_background(self):
         self.update_frame()
         self.set_camera(Camera(self.get_frame()))
@@ -442,17 +503,42 @@ class Scene(Container):
             # get applied to all animations
             animation.update_config(**kwargs)
         moving_mobjects = self.get_moving_mobjects(*animations)
+        is_cached = self.begin_render_cache_segment("play", animations)
 
         # Paint all non-moving objects onto the screen, so they don't
         # have to be rendered every frame
-        self.update_frame(excluded_mobjects = moving_mobjects)
-        static_image = self.get_frame()
-        for t in self.get_animation_time_progression(animations):
-            for animation in animations:
-                animation.update(t / animation.run_time)
-            self.continual_update()
-            self.update_frame(moving_mobjects, static_image)
-            self.add_frames(self.get_frame())
+        if not is_cached:
+            self.update_frame(excluded_mobjects = moving_mobjects)
+            static_image = self.get_frame()
+        time_progression = self.get_animation_time_progression(animations)
+        if is_cached:
+            # Mobjects still have to end up where the animations
+            # would leave them, just without rasterizing anything
+            for t in time_progression:
+                for animation in animations:
+                    animation.update(t / animation.run_time)
+                self.continual_update()
+                self.current_scene_time += self.frame_duration
+        elif self.should_render_frames_in_parallel(animations):
+            self.render_frames_in_parallel(
+                time_progression, animations,
+                moving_mobjects, static_image
+            )
+        else:
+            use_dirty_rectangles = self.should_use_dirty_rectangles()
+            last_box = None
+            for t in time_progression:
+                for animation in animations:
+                    animation.update(t / animation.run_time)
+                self.continual_update()
+                if use_dirty_rectangles:
+                    last_box = self.update_dirty_region(
+                        moving_mobjects, static_image, last_box
+                    )
+                else:
+                    self.update_frame(moving_mobjects, static_image)
+                self.add_frames(self.get_frame())
+        self.end_render_cache_segment()
         self.add(*moving_mobjects)
         self.mobjects_from_last_animation = moving_mobjects
         self.clean_up_animations(*animations)
@@ -465,6 +551,48 @@ class Scene(Container):
         self.num_plays += 1
         return self
 
+    def should_render_frames_in_parallel(self, animations):
+        return all([
+            self.num_render_processes > 1,
+            not self.skip_animations,
+            not self.save_pngs,
+            not self.should_continually_update(),
+            all([animation.is_pure() for animation in animations]),
+        ])
+
+    def render_frames_in_parallel(
+        self, time_progression, animations, 
+        moving_mobjects, static_image
+        ):
+        """
+        Workers are forked with a copy of the scene, animations and
+        static_image, then each rasterizes its own slices of times.
+        Frames come back in order, and are added here, so the state
+        of mobjects in this process never moves past the start of
+        the animations (clean_up_animations takes care of the rest).
+        """
+        global PARALLEL_RENDER_STATE
+        times = list(time_progression.iterable)
+        step = self.frames_per_render_task
+        time_slices = [
+            times[i:i+step]
+            for i in range(0, len(times), step)
+        ]
+        PARALLEL_RENDER_STATE = (
+            self, animations, moving_mobjects, static_image
+        )
+        pool = mp.Pool(min(self.num_render_processes, len(time_slices)))
+        try:
+            for frames in pool.imap(render_frames_for_times, time_slices):
+                self.add_frames(*frames)
+                time_progression.update(len(frames))
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+            PARALLEL_RENDER_STATE = None
+            time_progression.close()
+
     def clean_up_animations(self, *animations):
         for animation in animations:
             animation.clean_up(self)
@@ -477,7 +605,15 @@ class Scene(Container):
         return []
 
     def wait(self, duration = DEFAULT_WAIT_TIME):
-        if self.should_continually_update():
+        if self.begin_render_cache_segment("wait", duration):
+            if self.should_continually_update():
+                for t in self.get_time_progression(duration):
+                    self.continual_update()
+                    self.current_scene_time += self.frame_duration
+            else:
+                num_frames = int(duration / self.frame_duration)
+                self.current_scene_time += num_frames*self.frame_duration
+        elif self.should_continually_update():
             for t in self.get_time_progression(duration):
                 self.continual_update()
                 self.update_frame()
@@ -488,6 +624,7 @@ class Scene(Container):
         else:
             self.update_frame()
             self.add_frames(*[self.get_frame()]*int(duration / self.frame_duration))
+        self.end_render_cache_segment()
         return self
 
     def wait_to(self, time, assert_positive = True):
@@ -516,11 +653,14 @@ class Scene(Container):
             return
         self.current_scene_time += len(frames)*self.frame_duration
         if self.write_to_movie:
+            if self.is_using_render_cache() and self.current_segment is None:
+                self.begin_uncached_segment()
             for frame in frames:
                 if self.save_pngs:
                     self.save_image("frame" + str(self.frame_num), self.pngs_mode, True)
                     self.frame_num = self.frame_num + 1
-                self.writing_process.stdin.write(frame.tostring())
+                self.frame_writer.write_frame(frame)
+                self.num_frames_in_segment += 1
         if self.save_frames:
             self.saved_frames += list(frames)
 
@@ -565,12 +705,22 @@ class Scene(Container):
         return file_path
 
     def open_movie_pipe(self):
+        if self.is_using_render_cache():
+            self.render_cache = RenderCache(
+                self.render_cache_directory, self.render_cache_size
+            )
+            self.partial_movie_files = []
+            self.uncached_partial_movie_files = []
+            self.current_segment = None
+            return
         name = str(self)
         file_path = self.get_movie_file_path(name)
         temp_file_path = file_path.replace(name, name + "Temp")
         print("Writing to %s"%temp_file_path)
         self.args_to_rename_file = (temp_file_path, file_path)
+        self.start_writing_process(temp_file_path)
 
+    def start_writing_process(self, file_path):
         fps = int(1/self.frame_duration)
         height, width = self.camera.pixel_shape
         
@@ -596,21 +746,118 @@ class Scene(Container):
                 '-vcodec', 'libx264',
                 '-pix_fmt', 'yuv420p',
             ]
-        command += [temp_file_path]
+        command += [file_path]
         # self.writing_process = sp.Popen(command, stdin=sp.PIPE, shell=True)
         self.writing_process = sp.Popen(command, stdin=sp.PIPE)
+        self.frame_writer = FrameWriter(
+            self.writing_process, self.max_queued_frames
+        )
+        self.num_frames_in_segment = 0
 
-    def close_movie_pipe(self):
+    def stop_writing_process(self):
+        self.frame_writer.close()
         self.writing_process.stdin.close()
         self.writing_process.wait()
+
+    def close_movie_pipe(self):
+        if self.is_using_render_cache():
+            self.end_render_cache_segment()
+            file_path = self.get_movie_file_path()
+            print("Writing to %s"%file_path)
+            concatenate_movie_files(self.partial_movie_files, file_path)
+            for path in self.uncached_partial_movie_files:
+                os.remove(path)
+            self.render_cache.prune()
+            return
+        self.stop_writing_process()
         if os.name == 'nt':
             shutil.move(*self.args_to_rename_file)
         else:
             os.rename(*self.args_to_rename_file)
 
+    #Render cache
+
+    def is_using_render_cache(self):
+        return all([
+            self.use_render_cache,
+            self.write_to_movie,
+            not self.save_pngs,
+        ])
+
+    def begin_render_cache_segment(self, *inputs):
+        """
+        Hashes inputs along with the full state of the scene, and
+        either finds the corresponding partial movie in the cache, in
+        which case this returns True and nothing should be rasterized,
+        or starts writing frames to a new one.
+        """
+        if not self.is_using_render_cache() or self.skip_animations:
+            return False
+        #Close off any frames added since the last play or wait
+        self.end_render_cache_segment()
+        key = get_render_hash(
+            inputs,
+            self.mobjects,
+            self.foreground_mobjects,
+            self.continual_animations,
+            self.camera,
+            self.frame_duration,
+            self.movie_file_extension,
+            random.getstate(),
+            np.random.get_state(),
+        )
+        extension = self.movie_file_extension
+        file_path = self.render_cache.get_file_path(key, extension)
+        if self.render_cache.contains(file_path):
+            self.partial_movie_files.append(file_path)
+            return True
+        temp_file_path = self.render_cache.get_temp_file_path(key, extension)
+        self.start_writing_process(temp_file_path)
+        self.current_segment = (temp_file_path, file_path)
+        return False
+
+    def begin_uncached_segment(self):
+        #For frames added outside of play and wait
+        key = "uncached%d"%len(self.partial_movie_files)
+        temp_file_path = self.render_cache.get_temp_file_path(
+            key, self.movie_file_extension
+        )
+        self.start_writing_process(temp_file_path)
+        self.current_segment = (temp_file_path, None)
+
+    def end_render_cache_segment(self):
+        if not self.is_using_render_cache() or self.current_segment is None:
+            return
+        self.stop_writing_process()
+        temp_file_path, file_path = self.current_segment
+        self.current_segment = None
+        if self.num_frames_in_segment == 0:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+        elif file_path is None:
+            self.partial_movie_files.append(temp_file_path)
+            self.uncached_partial_movie_files.append(temp_file_path)
+        else:
+            self.render_cache.add(temp_file_path, file_path)
+            self.partial_movie_files.append(file_path)
+
 class EndSceneEarlyException(Exception):
     pass
 
+# Set by Scene.render_frames_in_parallel just before forking, so that
+# workers inherit the scene rather than having it pickled to them
+PARALLEL_RENDER_STATE = None
+
+def render_frames_for_times(times):
+    scene, animations, moving_mobjects, static_image = PARALLEL_RENDER_STATE
+    frames = []
+    for t in times:
+        for animation in animations:
+            animation.update(t / animation.run_time)
+        scene.update_frame(moving_mobjects, static_image)
+        frames.append(scene.get_frame())
+    return frames
+
 
 
 
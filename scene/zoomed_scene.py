@@ -123,6 +123,13 @@ class ZoomedScene(Scene):
                 mobjects, **kwargs
             )
             
+    def get_render_stats(self):
+        result = Scene.get_render_stats(self)
+        if hasattr(self, "zoomed_camera"):
+            for key, value in self.zoomed_camera.get_render_stats().items():
+                result["zoomed_" + key] = value
+        return result
+
     def get_moving_mobjects(self, *animations):
         moving_mobjects = Scene.get_moving_mobjects(self, *animations)
         if self.zoom_activated and self.little_rectangle in moving_mobjects:
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+
+from helpers import *
+from camera import Camera
+from mobject import ImageMobject
+from scene import Scene
+
+def get_rotated_image():
+    #Rotated an eighth of a turn, the corner missing from its
+    #points sticks out to the right of all of them
+    image = ImageMobject(255*np.ones((20, 20, 4), dtype = 'uint8'))
+    image.rotate(TAU/8)
+    return image
+
+class ImageBoxTest(unittest.TestCase):
+    def get_camera(self):
+        return Camera(pixel_shape = (90, 160))
+
+    def test_box_covers_all_corners(self):
+        image = get_rotated_image()
+        mins, maxes = image.get_own_points_box()
+        ul, ur, dl = image.points
+        for corner in ul, ur, dl, ur + dl - ul:
+            self.assertTrue(np.all(mins <= corner + 1e-8))
+            self.assertTrue(np.all(corner - 1e-8 <= maxes))
+
+    def test_culling_keeps_partly_visible_rotated_image(self):
+        camera = self.get_camera()
+        left_edge = -camera.space_shape[1]
+        image = get_rotated_image()
+        #Leaving only the corner missing from its points on screen
+        image.shift((left_edge - 0.5)*RIGHT)
+        self.assertLess(image.points[:,0].max(), left_edge - 0.1)
+        self.assertEqual(camera.cull_mobjects([image]), [image])
+        image.shift(2*LEFT)
+        self.assertEqual(camera.cull_mobjects([image]), [])
+
+class ImagePixelArrayTest(unittest.TestCase):
+    def test_pixel_array_is_read_only(self):
+        image = get_rotated_image()
+        with self.assertRaises(ValueError):
+            image.pixel_array[:,:,3] = 0
+        with self.assertRaises(ValueError):
+            image.copy().pixel_array[:,:,3] = 0
+
+    def test_edits_refresh_mipmaps(self):
+        image = get_rotated_image()
+        image_copy = image.copy()
+        self.assertEqual(image.get_mipmap(2)[0,0,0], 255)
+        image.highlight(BLACK)
+        self.assertEqual(image.get_mipmap(2)[0,0,0], 0)
+        image.set_opacity(0.5)
+        self.assertEqual(image.get_mipmap(2)[0,0,3], 127)
+        #Edits go into a new array, not the one the copy shares
+        self.assertEqual(image_copy.get_mipmap(2)[0,0,0], 255)
+        self.assertEqual(image_copy.pixel_array[0,0,3], 255)
+
+class DirtyRegionScene(object):
+    """
+    Just what Scene.update_dirty_region needs
+    """
+    update_dirty_region = Scene.update_dirty_region.im_func
+    capture_mobjects_in_camera = Scene.capture_mobjects_in_camera.im_func
+
+    def __init__(self, camera):
+        self.camera = camera
+
+class DirtyRectanglesTest(unittest.TestCase):
+    def test_moving_rotated_image_leaves_no_trail(self):
+        camera = Camera(pixel_shape = (90, 160))
+        static_image = np.array(camera.pixel_array)
+        scene = DirtyRegionScene(camera)
+        image = get_rotated_image()
+        camera.capture_mobject(image)
+        box = camera.get_pixel_bounding_box([image])
+        for x in range(3):
+            image.shift(RIGHT)
+            box = scene.update_dirty_region([image], static_image, box)
+        full_redraw = Camera(pixel_shape = (90, 160))
+        full_redraw.capture_mobject(image)
+        self.assertTrue(np.all(camera.pixel_array == full_redraw.pixel_array))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import numpy as np
+
+from helpers import *
+from mobject import VGroup
+from topics.geometry import Square, Circle
+
+class PointsTest(unittest.TestCase):
+    def test_points_are_read_only(self):
+        square = Square()
+        with self.assertRaises(ValueError):
+            square.points[0] = ORIGIN
+        with self.assertRaises(ValueError):
+            square.points += RIGHT
+
+    def test_copies_have_read_only_points(self):
+        square = Square()
+        for square_copy in square.copy(), square.deepcopy():
+            with self.assertRaises(ValueError):
+                square_copy.points[0] = ORIGIN
+
+    def test_assigning_points_updates_bounding_boxes(self):
+        square = Square()
+        group = VGroup(square, Circle())
+        self.assertTrue(np.allclose(group.get_right(), RIGHT))
+        points = np.array(square.points)
+        points[:,0] += 1
+        square.points = points
+        self.assertTrue(np.allclose(square.get_right(), 2*RIGHT))
+        self.assertTrue(np.allclose(group.get_right(), 2*RIGHT))
+
+    def test_transformations_leave_shared_points_alone(self):
+        square = Square()
+        square_copy = Square()
+        square_copy.points = square.points
+        square.shift(RIGHT).rotate(TAU/8).stretch(2, 0)
+        self.assertTrue(np.allclose(square_copy.get_right(), RIGHT))
+
+class PackedPointsTest(unittest.TestCase):
+    def get_group(self):
+        return VGroup(
+            VGroup(Square(), Circle().shift(2*RIGHT)),
+            Square().scale(0.5).shift(UP),
+        )
+
+    def transform(self, group):
+        group.shift(RIGHT)
+        group.rotate(TAU/7)
+        group.scale(1.5, about_edge = UP)
+        group.stretch(2, 1)
+
+    def assert_families_match(self, group1, group2):
+        family1 = group1.submobject_family()
+        family2 = group2.submobject_family()
+        self.assertEqual(len(family1), len(family2))
+        for mob1, mob2 in zip(family1, family2):
+            self.assertTrue(np.allclose(mob1.points, mob2.points))
+            self.assertTrue(np.allclose(
+                mob1.get_bounding_box(), mob2.get_bounding_box()
+            ))
+
+    def test_packed_transformations_match_unpacked(self):
+        packed = self.get_group().pack_family_points()
+        unpacked = self.get_group()
+        #With boxes cached beforehand, as well as without
+        self.assert_families_match(packed, unpacked)
+        self.transform(packed)
+        self.transform(unpacked)
+        self.assertIsNotNone(packed.get_packed_points())
+        self.assertIsNone(unpacked.get_packed_points())
+        self.assert_families_match(packed, unpacked)
+
+    def test_packed_edits_reach_outside_parents(self):
+        group = self.get_group()
+        before_packing = VGroup(group[0][0])
+        before_packing.get_bounding_box()
+        group.pack_family_points()
+        after_packing = VGroup(group[0][1])
+        after_packing.get_bounding_box()
+        self.transform(group)
+        for parent in before_packing, after_packing:
+            self.assertTrue(np.allclose(
+                parent.get_bounding_box(),
+                parent[0].get_bounding_box(),
+            ))
+
+    def test_reassigning_points_unpacks(self):
+        group = self.get_group().pack_family_points()
+        unpacked = self.get_group()
+        for mob in group, unpacked:
+            mob[1].points = mob[1].points + RIGHT
+        self.assertIsNone(group.get_packed_points())
+        self.transform(group)
+        self.transform(unpacked)
+        self.assert_families_match(group, unpacked)
+
+    def test_copies_are_unpacked(self):
+        group = self.get_group().pack_family_points()
+        unpacked = self.get_group()
+        for group_copy in group.copy(), group.deepcopy():
+            self.assertIsNone(group_copy.get_packed_points())
+            self.transform(group_copy)
+        self.assertIsNotNone(group.get_packed_points())
+        self.assert_families_match(group, unpacked)
+
+if __name__ == "__main__":
+    unittest.main()
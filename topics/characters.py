@@ -85,11 +85,6 @@ class PiCreature(SVGMobject):
         self.eyes.set_fill(WHITE, opacity = 1)
         return self
 
-    def copy(self):
-        copy_mobject = SVGMobject.copy(self)
-        copy_mobject.name_parts()
-        return copy_mobject
-
     def highlight(self, color):
         self.body.set_fill(color)
         return self
@@ -246,7 +246,7 @@ class ComplexFunction(ApplyPointwiseFunction):
             )
         ApplyPointwiseFunction.__init__(
             self,
-            lambda (x, y, z) : complex_to_R3(function(complex(x, y))),
+            complex_function_to_R3_function(function),
             instantiate(mobject),
             **kwargs
         )
@@ -256,11 +256,17 @@ class ComplexHomotopy(Homotopy):
         """
         Complex Hootopy a function Cx[0, 1] to C
         """
-        def homotopy(event):
-            x, y, z, t = event
-            c = complex_homotopy((complex(x, y), t))
-            return (c.real, c.imag, z)
-        Homotopy.__init__(self, homotopy, mobject, *args, **kwargs)
+        if is_vectorized_function(complex_homotopy):
+            @vectorized_function
+            def homotopy(x, y, z, t):
+                c = np.array(complex_homotopy((x + 1j*y, t)), dtype = complex)
+                c = c*np.ones(len(x))
+                return np.transpose([c.real, c.imag, z])
+        else:
+            def homotopy(x, y, z, t):
+                c = complex_homotopy((complex(x, y), t))
+                return (c.real, c.imag, z)
+        Homotopy.__init__(self, homotopy, mobject, **kwargs)
 
 
 
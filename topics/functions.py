@@ -16,13 +16,19 @@ class ParametricFunction(VMobject):
 
     def generate_points(self):
         n_points = 3*self.num_anchor_points - 2
-        self.points = np.zeros((n_points, self.dim))
-        self.points[:,0] = np.linspace(
+        points = np.zeros((n_points, self.dim))
+        points[:,0] = np.linspace(
             self.t_min, self.t_max, n_points
         )
+        self.points = points
         #VMobject.apply_function takes care of preserving
         #desirable tangent line properties at anchor points
-        self.apply_function(lambda p : self.function(p[0]))
+        if is_vectorized_function(self.function):
+            self.apply_function(vectorized_function(
+                lambda points : self.function(points[:,0])
+            ))
+        else:
+            self.apply_function(lambda p : self.function(p[0]))
 
 class FunctionGraph(ParametricFunction):
     CONFIG = {
@@ -33,6 +39,10 @@ class FunctionGraph(ParametricFunction):
     def __init__(self, function, **kwargs):
         digest_config(self, kwargs)
         parametric_function = lambda t : t*RIGHT + function(t)*UP
+        if is_vectorized_function(function):
+            parametric_function = vectorized_function(
+                lambda t : np.outer(t, RIGHT) + np.outer(function(t), UP)
+            )
         ParametricFunction.__init__(
             self, 
             parametric_function,
@@ -363,9 +363,6 @@ class BarChart(VGroup):
             )
             bar.move_to(bar_bottom, DOWN)
 
-    def copy(self):
-        return self.deepcopy()
-
 
 ### Cards ###
 